@@ -0,0 +1,76 @@
+import math
+import random
+import tracemalloc
+from pygame.math import Vector2
+from physics.colliders import CircleCollider, PolygonCollider
+from physics.collisionhandler import CollisionInfo
+from physics.shape_templates import ShapeTemplates
+from entities.platform import Platform
+from utils.game_manager import GameManager
+from utils.environment.platform_manager import PlatformManager
+from utils.settings import Settings
+
+# Reports how much memory platforms & contacts take and how much memory a frame retains
+
+def _make_platform(rng: random.Random) -> Platform:
+    size = rng.randint(25, 150)
+    if (rng.random() < 0.5):
+        coll = CircleCollider(Vector2(rng.randint(0, 1200), 0), size)
+    else:
+        n = rng.randint(3, 8)
+        offset = rng.random() * math.pi / 2
+        coll = PolygonCollider.from_shape(Vector2(rng.randint(0, 1200), 0), ShapeTemplates.regular_polygon(n, size, offset))
+    # reading the cached world space data makes the measurement include it
+    _ = coll.bounds, coll.tight_bounds
+    if (isinstance(coll, PolygonCollider)):
+        _ = coll.vertices
+    return Platform(False, coll, (50, 200, 200))
+
+# Average bytes per object, measured as the growth of traced memory while creating count objects
+def _bytes_per_object(create, count: int) -> float:
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [create() for _ in range(count)]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+# Polygon shapes are shared, so the templates are built beforehand and not counted per platform
+def bytes_per_platform(count: int = 2000) -> float:
+    rng = random.Random(1)
+    for _ in range(count):
+        _make_platform(rng)
+    rng.seed(1)
+    return _bytes_per_object(lambda: _make_platform(rng), count)
+
+def bytes_per_contact(count: int = 10000) -> float:
+    return _bytes_per_object(lambda: CollisionInfo(Vector2(0, -1), 2.5, Vector2(100, 100)), count)
+
+# Growth of the live memory blocks per headless frame (blocks still allocated at the end, grouped by line)
+# Objects freed again within the frames (ie. temporary vectors) don't count: this measures what frames
+# retain, not how many allocations they make
+def live_blocks_per_frame(frames: int = 600) -> float:
+    game = GameManager(headless=True, settings=Settings(seed=1))
+    tracemalloc.start()
+    snapshot_start = tracemalloc.take_snapshot()
+    game.simulate(frames)
+    snapshot_end = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    growth = sum(max(0, s.count_diff) for s in snapshot_end.compare_to(snapshot_start, 'lineno'))
+    return growth / frames
+
+def run() -> dict:
+    return {
+        'bytes_per_platform': bytes_per_platform(),
+        'bytes_per_contact': bytes_per_contact(),
+        'live_blocks_per_frame': live_blocks_per_frame()
+    }
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>22}: {value:10.1f}")
+    # the pools were filled by the simulated frames
+    for name, stats in PlatformManager.pool_stats().items():
+        print(f"{name:>22}: hit rate {stats['hit_rate']:6.1%}   {stats['hits']} hits, "
+              f"{stats['misses']} misses, {stats['dropped']} dropped")
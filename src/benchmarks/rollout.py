@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.world import World
+from utils.settings import Settings
+from utils.game_manager import GameManager
+from utils.input_source import InputState, ScriptedInput
+from utils.environment.platform_manager import PlatformManager
+from physics.player_control import PlayerController
+
+# Runs many seeded headless games with a scripted bot across processes, for tuning the game's constants
+# Every run is independent (its own World & seed) and only a small dict is sent back,
+# so the runs scale with the number of cores
+
+# Classes, whose class attributes can be overridden with 'Class.attribute' keys
+TUNABLE = {'PlatformManager': PlatformManager, 'PlayerController': PlayerController}
+
+# The player keeps moving and jumping, so the macro benchmark covers all of the gameplay code
+def bot_input() -> ScriptedInput:
+    return ScriptedInput([InputState(right=True)] * 10 + [InputState()] * 30 + [InputState(jump=True)] * 2 +
+                         [InputState(left=True)] * 10 + [InputState()] * 30, loop=True)
+
+# 'Class.attribute' -> (class, attribute)
+def find_tunable(key: str) -> tuple:
+    owner, _, attribute = key.partition('.')
+    if (owner not in TUNABLE or not hasattr(TUNABLE[owner], attribute)):
+        raise ValueError(f"unknown tunable: {key}")
+    return TUNABLE[owner], attribute
+
+# overrides = {'PlatformManager.spawn_delay': 2.0, ...}, set for every run of the process
+def apply_overrides(overrides: dict):
+    for key, value in overrides.items():
+        setattr(*find_tunable(key), value)
+
+# A single game until the bot dies or max_frames have been simulated
+def run_seed(seed: int, max_frames: int) -> dict:
+    world = World(GameManager.WIDTH, GameManager.HEIGHT, bot_input(), Settings(seed=seed))
+    world.begin()
+    frames = world.simulate(max_frames)
+    death = world.stats.death_type
+    return {
+        'seed': seed,
+        'score': int(world.stats.score),
+        'frames': frames,
+        'death': None if death is None else death.name.lower(),
+        'platforms': world.platforms.spawn_count
+    }
+
+# Streams the results of the seeds in the order they finish
+# workers = processes (all cores if None)
+def rollout(seeds, max_frames: int, overrides: dict = None, workers: int = None):
+    overrides = {} if overrides is None else overrides
+    # fail here instead of in every worker
+    for key in overrides:
+        find_tunable(key)
+    with ProcessPoolExecutor(workers, initializer=apply_overrides, initargs=(overrides,)) as executor:
+        futures = [executor.submit(run_seed, seed, max_frames) for seed in seeds]
+        for future in as_completed(futures):
+            yield future.result()
+
+# Aggregates run results into score distributions & death type ratios
+
+class RolloutStats:
+    def __init__(self, bucket: int = 10):
+        """bucket = width of the score histogram's buckets"""
+        self.bucket = bucket
+        self.scores: list[int] = []
+        self.frames = 0
+        self.platforms = 0
+        # 'fall', 'squish' & None (survived max_frames) -> count
+        self.deaths: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def add(self, result: dict):
+        self.scores.append(result['score'])
+        self.frames += result['frames']
+        self.platforms += result['platforms']
+        self.deaths[result['death']] = self.deaths.get(result['death'], 0) + 1
+
+    # Nearest-rank percentile of the scores
+    def percentile(self, p: float) -> int:
+        ordered = sorted(self.scores)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    # bucket start -> runs with a score in [start, start + bucket)
+    def histogram(self) -> dict[int, int]:
+        counts = {}
+        for score in self.scores:
+            start = score // self.bucket * self.bucket
+            counts[start] = counts.get(start, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def death_ratios(self) -> dict[str, float]:
+        return {('survived' if death is None else death): count / len(self) for death, count in self.deaths.items()}
+
+    def summary(self) -> dict:
+        if (len(self) == 0):
+            return {'runs': 0}
+        return {
+            'runs': len(self),
+            'score_mean': sum(self.scores) / len(self),
+            'score_percentiles': {f"p{int(p * 100)}": self.percentile(p) for p in (0.1, 0.5, 0.9, 0.99)},
+            'score_max': max(self.scores),
+            'score_histogram': self.histogram(),
+            'death_ratios': self.death_ratios(),
+            'frames_mean': self.frames / len(self),
+            'platforms_mean': self.platforms / len(self)
+        }
+
+# 'Class.attribute=value' (value is parsed as JSON, ie. a number)
+def parse_override(text: str) -> tuple:
+    key, _, value = text.partition('=')
+    return key, json.loads(value)
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Simulate seeded runs of a scripted bot across processes.")
+    parser.add_argument('--runs', type=int, default=1000, help="number of runs (one seed each)")
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--frames', type=int, default=18000, help="max frames per run")
+    parser.add_argument('--workers', type=int, default=None, help="processes (all cores by default)")
+    parser.add_argument('--set', action='append', default=[], type=parse_override, metavar='CLASS.ATTR=VALUE',
+                        help=f"override a tunable of {', '.join(TUNABLE)}")
+    parser.add_argument('--output', default='rollout_results.json', help="where to write the summary")
+    args = parser.parse_args(argv)
+
+    stats = RolloutStats()
+    start = time.perf_counter()
+    seeds = range(args.first_seed, args.first_seed + args.runs)
+    for result in rollout(seeds, args.frames, dict(args.set), args.workers):
+        stats.add(result)
+        if (len(stats) % 100 == 0):
+            print(f"{len(stats)}/{args.runs} runs, median score {stats.percentile(0.5)}", flush=True)
+    elapsed = time.perf_counter() - start
+
+    summary = stats.summary()
+    summary['overrides'] = dict(args.set)
+    with open(args.output, 'w', encoding='utf-8') as target:
+        target.write(json.dumps(summary, indent=4))
+
+    if (len(stats) == 0):
+        print("no runs")
+        return 0
+    print(f"{args.runs} runs in {elapsed:.1f} s ({args.runs / elapsed:.1f} runs/s, "
+          f"{args.workers or os.cpu_count()} workers)")
+    print(f"score mean {summary['score_mean']:.1f}, percentiles {summary['score_percentiles']}")
+    print(f"deaths {summary['death_ratios']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
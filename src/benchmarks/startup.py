@@ -0,0 +1,55 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Measures the time from launching the game to its first rendered frame
+# The game is started with --startup-bench, which prints the time.perf_counter() of its first frame & quits.
+# perf_counter uses a system-wide clock, so it can be compared with the one of this process.
+# The measurement includes the interpreter, imports, window creation, loading the save & fonts,
+# but not quitting (saving & interpreter teardown)
+
+# Milliseconds from launching the game to its first frame
+def launch(env: dict) -> float:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "src/main.py", "--startup-bench"], env=env, check=True,
+                            stdout=subprocess.PIPE, text=True)
+    for line in result.stdout.splitlines():
+        if (line.startswith("first frame at ")):
+            return (float(line[len("first frame at "):]) - start) * 1000
+    raise RuntimeError("the game didn't report its first frame")
+
+# cold = without the font cache (ie. the first launch on a machine)
+# font_cache = the game's font cache is kept here instead of the user's one
+def measure(runs: int, cold: bool, font_cache: str) -> list[float]:
+    env = dict(os.environ)
+    env.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    env['FONT_CACHE'] = font_cache
+    # no window system (ie. CI)
+    if (sys.platform.startswith('linux') and 'DISPLAY' not in env and 'WAYLAND_DISPLAY' not in env):
+        env['SDL_VIDEODRIVER'] = 'dummy'
+    times = []
+    for _ in range(runs):
+        if (cold and os.path.exists(font_cache)):
+            os.remove(font_cache)
+        times.append(launch(env))
+    return times
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Measure the time to the first frame of the game.")
+    parser.add_argument('--runs', type=int, default=5, help="launches per measurement")
+    args = parser.parse_args(argv)
+
+    # paths are relative to the repository root, like when starting the game
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+    with tempfile.TemporaryDirectory() as directory:
+        font_cache = os.path.join(directory, "font_cache.json")
+        for name, cold in (("cold (no font cache)", True), ("warm", False)):
+            times = sorted(measure(args.runs, cold, font_cache))
+            print(f"{name}: median {times[len(times) // 2]:.0f} ms, min {times[0]:.0f} ms, max {times[-1]:.0f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
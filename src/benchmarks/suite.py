@@ -0,0 +1,206 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import timeit
+from pygame.math import Vector2
+from pygame.surface import Surface
+from physics.colliders import CircleCollider, PolygonCollider
+from physics.collisionhandler import CollisionHandler
+from physics.shape_templates import ShapeTemplates
+from physics.batch_collision import BatchCollisionHandler, ColliderBatch
+from utils.game_manager import GameManager
+from utils.gui.stage import Stage
+from utils.environment.platform_manager import PlatformManager
+from utils.settings import Settings
+from utils.optional import HAS_NUMPY
+from benchmarks.rollout import bot_input
+
+# Micro & macro benchmarks, compared against a stored baseline
+# Every result is in seconds per operation (lower is better)
+
+def _regular_polygon(pos: Vector2, n: int, size: float) -> PolygonCollider:
+    return PolygonCollider(pos, [Vector2(math.cos(math.pi * 2 / n * i), math.sin(math.pi * 2 / n * i)) * size
+                                 for i in range(n)])
+
+def _per_op(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+def bench_circle_circle() -> float:
+    c1 = CircleCollider(Vector2(500, 500), 100)
+    c2 = CircleCollider(Vector2(650, 500), 100)
+    return _per_op(lambda: CollisionHandler.circle_circle(c1, c2), 20000)
+
+def bench_circle_polygon() -> float:
+    # the circle only touches a vertex, so every edge gets visited before the hit
+    circ = CircleCollider(Vector2(635, 500), 40)
+    poly = _regular_polygon(Vector2(500, 500), 8, 100)
+    return _per_op(lambda: CollisionHandler.circle_polygon(circ, poly), 20000)
+
+# A moving polygon, so its cached world space vertices are rebuilt for every test
+def bench_circle_polygon_moving() -> float:
+    circ = CircleCollider(Vector2(635, 500), 40)
+    poly = _regular_polygon(Vector2(500, 500), 8, 100)
+    nudge = Vector2(0, 0)
+    def test():
+        poly.translate(nudge)
+        CollisionHandler.circle_polygon(circ, poly)
+    return _per_op(test, 20000)
+
+def bench_point_line_segment_dist() -> float:
+    p0 = Vector2(0, 0)
+    p1 = Vector2(100, 50)
+    v = Vector2(40, 60)
+    return _per_op(lambda: CollisionHandler.point_line_segment_dist(p0, p1, v), 50000)
+
+def bench_polygon_construction() -> float:
+    verts = [Vector2(math.cos(math.pi / 4 * i), math.sin(math.pi / 4 * i)) * 100 for i in range(8)]
+    return _per_op(lambda: PolygonCollider(Vector2(0, 0), verts), 5000)
+
+def bench_polygon_from_template() -> float:
+    return _per_op(lambda: PolygonCollider.from_shape(Vector2(0, 0), ShapeTemplates.regular_polygon(8, 100, 0)), 5000)
+
+# A tall level of 300 platforms, like the generator produces
+def _scattered_colliders(count: int = 300) -> list:
+    rng = random.Random(5)
+    colliders = []
+    for _ in range(count):
+        pos = Vector2(rng.uniform(0, 1200), rng.uniform(0, 6000))
+        size = rng.randint(25, 150)
+        if (rng.random() < 0.5):
+            colliders.append(CircleCollider(pos, size))
+        else:
+            colliders.append(_regular_polygon(pos, rng.randint(3, 8), size))
+    return colliders
+
+def bench_circle_collision_loop() -> float:
+    circ = CircleCollider(Vector2(300, 300), 30)
+    colliders = _scattered_colliders()
+    return _per_op(lambda: [CollisionHandler.circle_collision(circ, c) for c in colliders], 200)
+
+def bench_circle_collision_batch() -> float:
+    circ = CircleCollider(Vector2(300, 300), 30)
+    batch = ColliderBatch(_scattered_colliders())
+    return _per_op(lambda: BatchCollisionHandler.circle_collision_batch(circ, batch), 200)
+
+# A single PlatformManager update in a crowded level (short spawn delay)
+def bench_platform_manager_update(frames: int = 600) -> float:
+    default_delay = PlatformManager.spawn_delay
+    PlatformManager.spawn_delay = 0.1
+    try:
+        game = GameManager(headless=True, settings=Settings(seed=1))
+        elapsed = 0
+        for _ in range(frames):
+            game.world.time.step()
+            start = time.perf_counter()
+            game.world.platforms.update()
+            elapsed += time.perf_counter() - start
+            game.player.controller.collision_response()
+    finally:
+        PlatformManager.spawn_delay = default_delay
+    return elapsed / frames
+
+# A full headless frame, restarting whenever the bot dies
+def bench_headless_frame(frames: int = 5000) -> float:
+    simulated = 0
+    seed = 0
+    start = time.perf_counter()
+    while (simulated < frames):
+        seed += 1
+        game = GameManager(headless=True, input_source=bot_input(), settings=Settings(seed=seed))
+        simulated += game.simulate(frames - simulated)
+    return (time.perf_counter() - start) / frames
+
+# Drawing a crowded level into an off-screen surface
+def bench_render_frame() -> float:
+    default_delay = PlatformManager.spawn_delay
+    PlatformManager.spawn_delay = 0.5
+    try:
+        game = GameManager(headless=True, settings=Settings(seed=6))
+        game.simulate(300)
+    finally:
+        PlatformManager.spawn_delay = default_delay
+    Stage.initialize(Surface((GameManager.WIDTH, GameManager.HEIGHT)))
+    Stage.interpolate(game.world.offset, game.world.offset, 1)
+    def render():
+        Stage.draw_background()
+        game.world.platforms.draw()
+        game.player.draw()
+    try:
+        return _per_op(render, 200)
+    finally:
+        Stage.initialize_headless(GameManager.WIDTH, GameManager.HEIGHT)
+
+def run(frames: int) -> dict:
+    results = {
+        'circle_circle': bench_circle_circle(),
+        'circle_polygon': bench_circle_polygon(),
+        'circle_polygon_moving': bench_circle_polygon_moving(),
+        'point_line_segment_dist': bench_point_line_segment_dist(),
+        'polygon_construction': bench_polygon_construction(),
+        'polygon_from_template': bench_polygon_from_template(),
+        'circle_collision_loop_300': bench_circle_collision_loop(),
+        'platform_manager_update': bench_platform_manager_update(),
+        'headless_frame': bench_headless_frame(frames),
+        'render_frame': bench_render_frame()
+    }
+    if (HAS_NUMPY):
+        results['circle_collision_batch_300'] = bench_circle_collision_batch()
+    return results
+
+# Names of the benchmarks, which are slower than baseline * (1 + tolerance)
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, value in results.items():
+        if (name not in baseline):
+            continue
+        if (value > baseline[name] * (1 + tolerance)):
+            regressions.append(name)
+    return regressions
+
+def report(results: dict, baseline: dict, regressions: list[str]):
+    for name, value in results.items():
+        line = f"{name:>26}: {value * 1e6:10.2f} us"
+        if (name in baseline):
+            line += f"   baseline {baseline[name] * 1e6:10.2f} us   x{value / baseline[name]:.2f}"
+        if (name in regressions):
+            line += "   REGRESSION"
+        print(line)
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument('--output', default='bench_results.json', help="where to write the results")
+    parser.add_argument('--baseline', default=os.path.join(os.path.dirname(__file__), 'baseline.json'))
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown, 0.2 = 20 %%")
+    parser.add_argument('--frames', type=int, default=5000, help="frames in the macro benchmark")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.frames)
+    with open(args.output, 'w', encoding='utf-8') as target:
+        target.write(json.dumps(results, indent=4))
+
+    if (args.save_baseline):
+        with open(args.baseline, 'w', encoding='utf-8') as target:
+            target.write(json.dumps(results, indent=4))
+        report(results, {}, [])
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    # timings depend on the machine, so the baseline is stored locally instead of being committed
+    if (not os.path.exists(args.baseline)):
+        report(results, {}, [])
+        print(f"no baseline found at {args.baseline}, run with --save-baseline to store one")
+        return 2
+    with open(args.baseline, 'r', encoding='utf-8') as target:
+        baseline = json.loads(target.read())
+
+    regressions = compare(results, baseline, args.tolerance)
+    report(results, baseline, regressions)
+    return 1 if len(regressions) > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -4,15 +4,19 @@ from physics.colliders import Collider
 # Base class for all game objects
 
 class Entity:
+    __slots__ = ('coll', 'right', 'up', 'color', 'prev_pos')
+
     def __init__(self, collider: Collider, color: tuple):
         self.coll = collider
         self.right = Vector2(1, 0)
         self.up = Vector2(0, -1)
         self.color = color
+        # position during the previous physics step (for render interpolation)
+        self.prev_pos = Vector2(collider.pos)
 
     # Move entity in world space
     def translate(self, translation: Vector2):
-        self.coll.pos += translation
+        self.coll.translate(translation)
 
     # Convert a direction vector from world space tp object space
     def world_to_obj(self, v: Vector2) -> Vector2:
@@ -22,5 +26,16 @@ class Entity:
     def obj_to_world(self, v: Vector2) -> Vector2:
         return v.x * self.right + v.y * self.up
 
-    def draw(self):
-        self.coll.draw_coll(self.color)
+    # Store the position before a physics step
+    def store_position(self):
+        self.prev_pos.update(self.coll.pos)
+
+    # How far the interpolated render position is from the current position
+    # alpha = how far the rendered frame is between the previous and the current physics step
+    def render_offset(self, alpha: float) -> Vector2:
+        if (self.prev_pos == self.coll.pos):
+            return None
+        return (self.prev_pos - self.coll.pos) * (1 - alpha)
+
+    def draw(self, alpha: float = 1):
+        self.coll.draw_coll(self.color, self.render_offset(alpha))
@@ -1,13 +1,103 @@
 from pygame.math import Vector2
 from physics.colliders import Collider
 from entities.entity import Entity
-from utils.data.time import Time
+from utils.object_pool import ObjectPool
+
+# A platform's state lives either in the object itself or, once added to a PlatformStore, in the store
+# In the latter case the platform is a view: the collider is synced from the store when accessed
 
 class Platform(Entity):
+    # coll is a property here, so the collider is kept in __coll instead of the inherited slot
+    __slots__ = ('__coll', '__vel', '__synced_epoch', 'is_static', 'spawn_id', 'store', 'row')
+    # unloaded platforms, waiting to be reused
+    pool = ObjectPool(64)
+
     def __init__(self, is_static: bool, collider: Collider, color: tuple):
         super().__init__(collider, color)
+        self.__vel = Vector2(0, 0)
+        self.reset(is_static, collider, color)
+
+    # Reuse a pooled platform when possible (same arguments as the constructor)
+    @classmethod
+    def acquire(cls, is_static: bool, collider: Collider, color: tuple) -> 'Platform':
+        platform = cls.pool.acquire()
+        if (platform is None):
+            return cls(is_static, collider, color)
+        platform.reset(is_static, collider, color)
+        return platform
+
+    # (Re)initialize the platform (shared by the constructor & acquire)
+    def reset(self, is_static: bool, collider: Collider, color: tuple):
+        # (store, row) of the platform, when stored in a PlatformStore
+        self.store = None
+        self.row = -1
+        self.coll = collider
+        self.right.update(1, 0)
+        self.up.update(0, -1)
+        self.color = color
+        self.prev_pos.update(collider.pos)
         self.is_static = is_static
-        self.vel = Vector2(0, 0)
-    
-    def move(self):
-        self.translate(self.vel * Time.dt)
+        self.__vel.update(0, 0)
+        # order of creation, assigned by PlatformManager
+        self.spawn_id = 0
+        self.__synced_epoch = -1
+
+    # Return an unloaded platform & its collider to their pools
+    # The platform must already be removed from everything that references it
+    @classmethod
+    def release(cls, platform: 'Platform'):
+        Collider.release(platform.coll)
+        cls.pool.release(platform)
+
+    @property
+    def coll(self) -> Collider:
+        if (self.store is not None and not self.is_static and self.__synced_epoch != self.store.epoch):
+            self.__synced_epoch = self.store.epoch
+            self.__coll.move_to(self.store.pos[self.row, 0], self.store.pos[self.row, 1])
+        return self.__coll
+    @coll.setter
+    def coll(self, value: Collider):
+        self.__coll = value
+
+    # A copy of the velocity, whether it lives in a store or not: modifying it in place has no effect,
+    # assign a new one instead (platform.vel = ...)
+    @property
+    def vel(self) -> Vector2:
+        if (self.store is not None):
+            return Vector2(float(self.store.vel[self.row, 0]), float(self.store.vel[self.row, 1]))
+        return Vector2(self.__vel)
+    @vel.setter
+    def vel(self, value: Vector2):
+        if (self.store is not None):
+            self.store.vel[self.row] = (value.x, value.y)
+        self.__vel.update(value)
+
+    # Attach the platform to a store, which takes over its state
+    def attach(self, store, row: int):
+        self.store = store
+        self.row = row
+        self.__synced_epoch = -1
+
+    def detach(self):
+        coll = self.coll
+        self.__vel.update(self.vel)
+        self.prev_pos.update(coll.pos)
+        self.store = None
+        self.row = -1
+
+    # Stored platforms are moved by the store
+    def move(self, dt: float):
+        self.translate(self.__vel * dt)
+
+    def store_position(self):
+        if (self.store is None):
+            super().store_position()
+
+    def render_offset(self, alpha: float) -> Vector2:
+        if (self.store is None):
+            return super().render_offset(alpha)
+        prev = self.store.prev_pos[self.row]
+        pos = self.store.pos[self.row]
+        if (prev[0] == pos[0] and prev[1] == pos[1]):
+            return None
+        return Vector2(float(prev[0] - pos[0]), float(prev[1] - pos[1])) * (1 - alpha)
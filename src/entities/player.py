@@ -2,28 +2,35 @@ from pygame.math import Vector2
 from entities.entity import Entity
 from physics.player_control import PlayerController
 from physics.colliders import CircleCollider
+from utils.input_source import InputSource
 from utils.gui.stage import Stage
-from utils.data.time import Time
 from utils.gui.camera import Camera
 
 # Player entity
 
 class Player(Entity):
-    # Singleton (only 1 player is allowed)
-    instance: 'Player' = None
+    __slots__ = ('world', 'controller', 'camera', 'sweep')
 
-    def __init__(self, start_pos: Vector2, radius: float):
+    def __init__(self, world, start_pos: Vector2, radius: float, input_source: InputSource = None, sweep = None):
+        """
+        world = the World the player lives in\n
+        sweep = for continuous collision: function (collider, motion) -> how far along motion [0, 1] the player
+        can move before hitting something (the player moves the full motion if None)
+        """
         super().__init__(CircleCollider(start_pos, radius), (255, 0, 0))
-        self.controller = PlayerController(self)
-        self.camera = Camera(self)
-
-        Player.instance = self
+        self.world = world
+        self.controller = PlayerController(world, self, input_source)
+        self.camera = Camera(world, self)
+        self.sweep = sweep
 
     def update(self):
         self.controller.update()
-        self.translate(self.controller.vel * Time.dt)
+        motion = self.controller.vel * self.world.time.dt
+        if (self.sweep is not None):
+            motion *= self.sweep(self.coll, motion)
+        self.translate(motion)
 
-    def draw(self):
-        super().draw()
+    def draw(self, alpha: float = 1):
+        super().draw(alpha)
         if (self.controller.collision_point is not None):
-            Stage.draw_circle(self.controller.collision_point, 5, (0, 255, 0))
+            Stage.draw_circle(self.controller.collision_point, 5, (0, 255, 0), self.render_offset(alpha))
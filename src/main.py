@@ -1,4 +1,17 @@
+import sys
 from utils.game_manager import GameManager
+from utils.profiler import Profiler
+from utils.settings import Settings
 
 if __name__ == "__main__":
-    GameManager()
+    if ("--profile" in sys.argv[1:]):
+        Profiler.enabled = True
+        Profiler.dump_path = "profile.json"
+    # report when the first frame is shown & quit (see benchmarks/startup.py)
+    startup_bench = "--startup-bench" in sys.argv[1:]
+    # every run is saved as a replay (see GameManager.from_replay)
+    replay_dir = "replays" if "--record" in sys.argv[1:] else None
+    GameManager(settings=Settings(dirty_rects="--dirty-rects" in sys.argv[1:],
+                                  continuous_collision="--continuous-collision" in sys.argv[1:],
+                                  replay_dir=replay_dir,
+                                  max_frames=1 if startup_bench else None, report_startup=startup_bench))
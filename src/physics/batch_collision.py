@@ -0,0 +1,171 @@
+from pygame.math import Vector2
+from physics.colliders import Collider, CircleCollider
+from physics.collisionhandler import CollisionHandler, CollisionInfo
+from utils.optional import np, HAS_NUMPY
+
+# Colliders packed into arrays, so they can be tested against a circle in one go
+
+class ColliderBatch:
+    def __init__(self, colliders: list[Collider]):
+        """
+        Build once for a set of colliders and call refresh() after they move.\n
+        Polygon edges are stored in arrays padded to the largest degree in the batch.
+        """
+        self.colliders = colliders
+        self.is_circle = np.array([isinstance(c, CircleCollider) for c in colliders], dtype=bool)
+        self.circles = np.flatnonzero(self.is_circle)
+        self.polygons = np.flatnonzero(~self.is_circle)
+
+        # local space bounds (left, top, width, height)
+        self.local_bounds = np.array([(c.local_bounds.left, c.local_bounds.top, c.local_bounds.width,
+                                       c.local_bounds.height) for c in colliders], dtype=float).reshape(-1, 4)
+        self.radii = np.array([colliders[i].radius for i in self.circles], dtype=float)
+        self.__build_polygons()
+        self.pos = np.zeros((len(colliders), 2))
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self.colliders)
+
+    def __build_polygons(self):
+        polygons = [self.colliders[i] for i in self.polygons]
+        degree = max((p.degree for p in polygons), default=1)
+        self.local_v0 = np.zeros((len(polygons), degree, 2))
+        self.local_v1 = np.zeros((len(polygons), degree, 2))
+        self.normals = np.zeros((len(polygons), degree, 2))
+        self.valid = np.zeros((len(polygons), degree), dtype=bool)
+        for k, p in enumerate(polygons):
+            local = np.array([(v.x, v.y) for v in p.local_vertices])
+            self.local_v0[k, :p.degree] = local
+            self.local_v1[k, :p.degree] = np.roll(local, -1, axis=0)
+            self.normals[k, :p.degree] = [(n.x, n.y) for n in p.normals]
+            self.valid[k, :p.degree] = True
+
+    # Read the current positions of the colliders (or only the ones at the given indices)
+    def refresh(self, indices: list[int] = None):
+        if (indices is None):
+            indices = range(len(self.colliders))
+        for i in indices:
+            pos = self.colliders[i].pos
+            self.pos[i, 0] = pos.x
+            self.pos[i, 1] = pos.y
+
+    # The same padded integer bounds as Collider.bounds (left, top, right, bottom)
+    def bounds(self):
+        pad = Collider.BoundsPadding
+        left = np.trunc(self.local_bounds[:, 0] + self.pos[:, 0] - pad)
+        top = np.trunc(self.local_bounds[:, 1] + self.pos[:, 1] - pad)
+        return left, top, left + self.local_bounds[:, 2] + 2 * pad, top + self.local_bounds[:, 3] + 2 * pad
+
+# Tests a single circle against many colliders at once
+
+class BatchCollisionHandler:
+    """Vectorized version of CollisionHandler.circle_collision for scenes with hundreds of platforms."""
+    # Returns the same results as CollisionHandler.circle_collision for each collider (None = no collision)
+    @classmethod
+    def circle_collision(cls, circ: CircleCollider, colliders: list[Collider]) -> list[CollisionInfo]:
+        if (not HAS_NUMPY):
+            return [CollisionHandler.circle_collision(circ, c) for c in colliders]
+        return cls.circle_collision_batch(circ, ColliderBatch(colliders))
+
+    # Results are in the order of batch.colliders
+    @classmethod
+    def circle_collision_batch(cls, circ: CircleCollider, batch: ColliderBatch) -> list[CollisionInfo]:
+        results = [None] * len(batch)
+        if (len(batch) == 0):
+            return results
+
+        # broad phase
+        b = circ.bounds
+        left, top, right, bottom = batch.bounds()
+        overlapping = (b.right > left) & (b.bottom > top) & (b.left < right) & (b.top < bottom)
+
+        if (len(batch.circles) > 0):
+            cls.__circle_circle(circ, batch, overlapping[batch.circles], results)
+        if (len(batch.polygons) > 0):
+            cls.__circle_polygon(circ, batch, overlapping[batch.polygons], results)
+        return results
+
+    # candidates = mask of the circles passing the broad phase
+    @classmethod
+    def __circle_circle(cls, circ: CircleCollider, batch: ColliderBatch, candidates, results: list):
+        sel = np.flatnonzero(candidates)
+        if (len(sel) == 0):
+            return
+        indices = batch.circles[sel]
+        radii = batch.radii[sel]
+
+        # circles are overlapping when the distance between their centers is less than the sum of their radii
+        diff = np.array((circ.pos.x, circ.pos.y)) - batch.pos[indices]
+        d2 = diff[:, 0] * diff[:, 0] + diff[:, 1] * diff[:, 1]
+        radii_sum = circ.radius + radii
+        hit = ~(radii_sum**2 < d2)
+
+        for k in np.flatnonzero(hit):
+            d = float(np.sqrt(d2[k]))
+            n = Vector2(CollisionHandler.coincident_normal) if d == 0 else Vector2(diff[k, 0] / d, diff[k, 1] / d)
+            results[indices[k]] = CollisionInfo.acquire(n, float(radii_sum[k]) - d, circ.pos - n * (d - radii[k]))
+
+    # candidates = mask of the polygons passing the broad phase
+    @classmethod
+    def __circle_polygon(cls, circ: CircleCollider, batch: ColliderBatch, candidates, results: list):
+        sel = np.flatnonzero(candidates)
+        if (len(sel) == 0):
+            return
+        indices = batch.polygons[sel]
+        v0, v1, valid = cls.__edges(batch, sel)
+        c = np.array((circ.pos.x, circ.pos.y))
+        dist, edge_hit = cls.__edge_hits(c, circ.radius, v0, v1, valid)
+        vertex_hit = cls.__vertex_hits(c, circ.radius_squared, v0, valid)
+        # circle center in polygon (unimplemented, so no collision)
+        for k in np.flatnonzero(cls.__is_outside(c, v0, batch.normals[sel], valid)):
+            results[indices[k]] = cls.__polygon_contact(circ, batch.colliders[indices[k]],
+                                                        dist[k], edge_hit[k], vertex_hit[k])
+
+    # World space edges (v0 -> v1) of the selected polygons & the mask of the edges, which aren't padding
+    @classmethod
+    def __edges(cls, batch: ColliderBatch, sel) -> tuple:
+        pos = batch.pos[batch.polygons[sel]][:, None, :]
+        return batch.local_v0[sel] + pos, batch.local_v1[sel] + pos, batch.valid[sel]
+
+    # Mask of the polygons, which don't contain the center c
+    @classmethod
+    def __is_outside(cls, c, v0, normals, valid):
+        to_center = v0 - c
+        facing = to_center[:, :, 0] * normals[:, :, 0] + to_center[:, :, 1] * normals[:, :, 1]
+        return ~np.all((facing >= 0) | ~valid, axis=1)
+
+    # Distance from the center c to every edge (-1 when the closest point is 'off' the edge)
+    # Returns (distances, mask of the edges within the radius)
+    @classmethod
+    def __edge_hits(cls, c, radius: float, v0, v1, valid) -> tuple:
+        p01 = v1 - v0
+        v0c = c - v0
+        length2 = p01[:, :, 0] * p01[:, :, 0] + p01[:, :, 1] * p01[:, :, 1]
+        length2[~valid] = 1
+        t = (p01[:, :, 0] * v0c[:, :, 0] + p01[:, :, 1] * v0c[:, :, 1]) / length2
+        line_points = v0 * (1 - t)[:, :, None] + v1 * t[:, :, None]
+        to_line = c - line_points
+        dist = np.sqrt(to_line[:, :, 0] * to_line[:, :, 0] + to_line[:, :, 1] * to_line[:, :, 1])
+        dist[(t < 0) | (t > 1)] = -1
+        return dist, valid & (dist >= 0) & (dist <= radius)
+
+    # Mask of the vertices inside the circle
+    @classmethod
+    def __vertex_hits(cls, c, radius_squared: float, v0, valid):
+        v0c = c - v0
+        vertex_d2 = v0c[:, :, 0] * v0c[:, :, 0] + v0c[:, :, 1] * v0c[:, :, 1]
+        return valid & (vertex_d2 < radius_squared)
+
+    # The contact of a single polygon: the first edge in order wins, then the first vertex
+    @classmethod
+    def __polygon_contact(cls, circ: CircleCollider, p, dist, edge_hit, vertex_hit) -> CollisionInfo:
+        if (edge_hit.any()):
+            i = int(np.argmax(edge_hit))
+            n = p.normals[i]
+            l = float(dist[i])
+            return CollisionInfo.acquire(n, circ.radius - l, circ.pos - n * l)
+        if (vertex_hit.any()):
+            v = p.vertices[int(np.argmax(vertex_hit))]
+            return CollisionInfo.acquire(Vector2.normalize(circ.pos - v), circ.radius - Vector2.length(circ.pos - v), v)
+        return None
@@ -1,42 +1,122 @@
 from pygame.math import Vector2
 from pygame.rect import Rect
 from utils.gui.stage import Stage
+from utils.object_pool import ObjectPool
 
 # Base type for all colliders
 
 class Collider:
     SkinWidth = 1
+    BoundsPadding = 3
+
+    # Slots keep colliders compact, there can be hundreds of them alive at once
+    __slots__ = ('__pos', '_bounds', 'version', '__world_bounds', '__tight_bounds', '__bounds_version')
 
     def __init__(self, pos: Vector2):
-        self.pos = pos
+        self.__pos = pos
         self._bounds : Rect = None
+        # incremented whenever the collider moves, so world space caches know when to rebuild
+        self.version = 0
+        # world space bounds are updated in place, only after the collider has moved
+        self.__world_bounds = Rect(0, 0, 0, 0)
+        self.__tight_bounds = Rect(0, 0, 0, 0)
+        self.__bounds_version = -1
+
+    # The position must be changed through the setter or translate() to keep the caches valid
+    @property
+    def pos(self) -> Vector2:
+        return self.__pos
+    @pos.setter
+    def pos(self, value: Vector2):
+        self.__pos = value
+        self.version += 1
+
+    # Move the collider in world space
+    def translate(self, translation: Vector2):
+        self.__pos += translation
+        self.version += 1
+
+    # Place the collider at the given world space position
+    def move_to(self, x: float, y: float):
+        self.__pos.update(x, y)
+        self.version += 1
     
     # Slightly larger than the actual bounds because it helps the player stick to colliders
+    # The returned Rect is cached and shared: do not modify it
+    @property
+    def bounds(self) -> Rect:
+        if (self.__bounds_version != self.version):
+            self.__update_bounds()
+        return self.__world_bounds
+
+    # The actual world space bounds without padding
+    # The returned Rect is cached and shared: do not modify it
     @property
-    def bounds(self):
-        return Rect(self._bounds.left + self.pos.x - 3, self._bounds.top + self.pos.y - 3, 
-                    self._bounds.width + 6, self._bounds.height + 6)
+    def tight_bounds(self) -> Rect:
+        if (self.__bounds_version != self.version):
+            self.__update_bounds()
+        return self.__tight_bounds
+
+    # The bounds relative to pos, without padding
+    # The returned Rect is shared: do not modify it
+    @property
+    def local_bounds(self) -> Rect:
+        return self._bounds
+
+    def __update_bounds(self):
+        pad = Collider.BoundsPadding
+        left = self._bounds.left + self.__pos.x
+        top = self._bounds.top + self.__pos.y
+        self.__world_bounds.update(left - pad, top - pad, 
+                                   self._bounds.width + 2 * pad, self._bounds.height + 2 * pad)
+        self.__tight_bounds.update(left, top, self._bounds.width, self._bounds.height)
+        self.__bounds_version = self.version
     
+    # Return a collider, which is no longer used anywhere, to the pool of its type
+    @classmethod
+    def release(cls, coll: 'Collider'):
+        type(coll).pool.release(coll)
+
     @classmethod
     def overlap(cls, bounds1: Rect, bounds2: Rect) -> bool:
         return bounds1.right > bounds2.left and bounds1.bottom > bounds2.top \
                and bounds1.left < bounds2.right and bounds1.top < bounds2.bottom
     
-    def draw_coll(self, color: tuple):
+    # offset = added to the drawn position (used for interpolation)
+    def draw_coll(self, color: tuple, offset: Vector2 = None):
         pass
 
 # A radial collider around a given position
 
 class CircleCollider(Collider):
+    __slots__ = ('__r', '__r2')
+    # colliders of unloaded platforms, waiting to be reused
+    pool = ObjectPool(64)
+
     def __init__(self, pos, radius):
         """
         pos = center position in world space\n
         radius = circle radius
         """
         super().__init__(pos)
+        self._bounds = Rect(0, 0, 0, 0)
+        self.reset(pos, radius)
+
+    # Reuse a pooled collider when possible (same arguments as the constructor)
+    @classmethod
+    def acquire(cls, pos: Vector2, radius: float) -> 'CircleCollider':
+        coll = cls.pool.acquire()
+        if (coll is None):
+            return cls(pos, radius)
+        coll.reset(pos, radius)
+        return coll
+
+    # (Re)initialize the collider (shared by the constructor & acquire)
+    def reset(self, pos: Vector2, radius: float):
+        self.pos = pos
         self.__r = max(1, radius)
         self.__r2 = self.__r**2
-        self._bounds = Rect(-self.__r, -self.__r, self.__r * 2, self.__r * 2)
+        self._bounds.update(-self.__r, -self.__r, self.__r * 2, self.__r * 2)
     
     @property
     def radius(self):
@@ -45,60 +125,45 @@ class CircleCollider(Collider):
     def radius_squared(self):
         return self.__r2
     
-    def draw_coll(self, color):
-        Stage.draw_circle(self.pos, self.radius, color)
+    def draw_coll(self, color, offset = None):
+        Stage.draw_circle(self.pos, self.radius, color, offset)
 
-# A convex polygon collider defined by a set of vertices
+# Local space data of a convex polygon, which can be shared by any number of colliders
 
-class PolygonCollider(Collider):    
-    def __init__(self, pos: Vector2, vertex_array: list):
+class PolygonShape:
+    __slots__ = ('vertices', 'degree', 'is_clockwise', 'bounds', 'normals', 'centroid')
+
+    def __init__(self, vertex_array: list):
         """
-        pos = world space position\n
-        vertex_array = list of vertices relative to pos
+        vertex_array = list of vertices relative to the position of the collider\n
+        The shape is shared: neither it nor its vertices may be modified afterwards
         """
-        super().__init__(pos)
         if (len(vertex_array) < 3):
             raise ValueError("A polygon must have a minimum of 3 vertices!")
-        
-        self.__vertices = vertex_array
-        self.__vert_count = len(vertex_array)
+
+        self.vertices = vertex_array
+        self.degree = len(vertex_array)
         self.__check_convex()
         self.__compute_bounds()
         self.__compute_normals()
         self.__compute_centroid()
 
-    @property
-    def vertices(self):
-        return [v + self.pos for v in self.__vertices]
-    @property
-    def degree(self):
-        return self.__vert_count
-    @property
-    def is_clockwise(self):
-        return self.__clockwise
-    @property
-    def normals(self):
-        return self.__normals
-    @property
-    def centroid(self):
-        return self.__centroid + self.pos
-
     # The collider has to be convex and the vertices need to be in order
     def __check_convex(self):
-        sign = Vector2.cross(self.__vertices[-1] - self.__vertices[0], 
-                             self.__vertices[1] - self.__vertices[0])
-        for i in range(1, self.__vert_count):
-            v1 = self.__vertices[i - 1] - self.__vertices[i]
-            v2 = self.__vertices[(i + 1) % self.__vert_count] - self.__vertices[i]
+        sign = Vector2.cross(self.vertices[-1] - self.vertices[0], 
+                             self.vertices[1] - self.vertices[0])
+        for i in range(1, self.degree):
+            v1 = self.vertices[i - 1] - self.vertices[i]
+            v2 = self.vertices[(i + 1) % self.degree] - self.vertices[i]
             if (sign * Vector2.cross(v1, v2) < 0):
                 raise ValueError("Polygon Collider only supports convex polygons!")
-        self.__clockwise = sign < 0
+        self.is_clockwise = sign < 0
     
     # bounds = the smallest AABB (axis aligned bounding box), which the polygon can fit in
     def __compute_bounds(self):
-        _min = Vector2(self.__vertices[0].x, self.__vertices[0].y)
-        _max = Vector2(self.__vertices[0].x, self.__vertices[0].y)
-        for v in self.__vertices:
+        _min = Vector2(self.vertices[0].x, self.vertices[0].y)
+        _max = Vector2(self.vertices[0].x, self.vertices[0].y)
+        for v in self.vertices:
             if (_min.x > v.x):
                 _min.x = v.x
             elif (_max.x < v.x):
@@ -107,24 +172,92 @@ class PolygonCollider(Collider):
                 _min.y = v.y
             elif (_max.y < v.y):
                 _max.y = v.y
-        self._bounds = Rect(_min.x, _min.y, _max.x - _min.x, _max.y - _min.y)
+        self.bounds = Rect(_min.x, _min.y, _max.x - _min.x, _max.y - _min.y)
 
     # Calculate the normal vector for every edge of the polygon
     def __compute_normals(self):
-        self.__normals = []
-        for i in range(self.__vert_count):
-            v0 = self.__vertices[i]
-            v1 = self.__vertices[(i + 1) % self.__vert_count]
+        self.normals = []
+        for i in range(self.degree):
+            v0 = self.vertices[i]
+            v1 = self.vertices[(i + 1) % self.degree]
             v01 = Vector2.normalize(v1 - v0)
-            self.__normals.append(Vector2(v01.y, -v01.x) if self.__clockwise 
-                                  else Vector2(-v01.y, v01.x))
+            self.normals.append(Vector2(v01.y, -v01.x) if self.is_clockwise 
+                                else Vector2(-v01.y, v01.x))
 
     # centroid = center of rotation
     def __compute_centroid(self):
         _sum = Vector2(0, 0)
-        for v in self.__vertices:
+        for v in self.vertices:
             _sum += v
-        self.__centroid = _sum / self.__vert_count
+        self.centroid = _sum / self.degree
+
+# A convex polygon collider defined by a set of vertices
+
+class PolygonCollider(Collider):
+    __slots__ = ('__shape', '__world_vertices', '__world_version')
+    # colliders of unloaded platforms, waiting to be reused
+    pool = ObjectPool(64)
+
+    def __init__(self, pos: Vector2, vertex_array: list):
+        """
+        pos = world space position\n
+        vertex_array = list of vertices relative to pos
+        """
+        super().__init__(pos)
+        self.reset(pos, PolygonShape(vertex_array))
+
+    # Trusted constructor: the shape has already been validated, so nothing is recomputed
+    @classmethod
+    def from_shape(cls, pos: Vector2, shape: PolygonShape) -> 'PolygonCollider':
+        coll = cls.__new__(cls)
+        Collider.__init__(coll, pos)
+        coll.reset(pos, shape)
+        return coll
+
+    # Trusted constructor, which reuses a pooled collider when possible
+    @classmethod
+    def acquire(cls, pos: Vector2, shape: PolygonShape) -> 'PolygonCollider':
+        coll = cls.pool.acquire()
+        if (coll is None):
+            return cls.from_shape(pos, shape)
+        coll.reset(pos, shape)
+        return coll
+
+    # (Re)initialize the collider (shared by the constructors & acquire)
+    def reset(self, pos: Vector2, shape: PolygonShape):
+        self.pos = pos
+        self.__shape = shape
+        self._bounds = shape.bounds
+        # world space vertices are rebuilt lazily, only after the collider has moved
+        self.__world_vertices: list[Vector2] = None
+        self.__world_version = -1
+
+    # The returned list is cached and shared: do not modify it
+    @property
+    def vertices(self) -> list[Vector2]:
+        if (self.__world_version != self.version):
+            self.__world_vertices = [v + self.pos for v in self.__shape.vertices]
+            self.__world_version = self.version
+        return self.__world_vertices
+    # vertices relative to pos
+    @property
+    def local_vertices(self) -> list[Vector2]:
+        return self.__shape.vertices
+    @property
+    def shape(self) -> PolygonShape:
+        return self.__shape
+    @property
+    def degree(self):
+        return self.__shape.degree
+    @property
+    def is_clockwise(self):
+        return self.__shape.is_clockwise
+    @property
+    def normals(self):
+        return self.__shape.normals
+    @property
+    def centroid(self):
+        return self.__shape.centroid + self.pos
 
-    def draw_coll(self, color):
-        Stage.draw_polygon(self.vertices, color)
+    def draw_coll(self, color, offset = None):
+        Stage.draw_shape(self.__shape, self.pos, color, offset)
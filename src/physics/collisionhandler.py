@@ -1,16 +1,39 @@
 import math
 from pygame.math import Vector2
 from physics.colliders import Collider, CircleCollider, PolygonCollider
+from utils.object_pool import ObjectPool
 
 # A datatype holding information relating to collisions between colliders
 
 class CollisionInfo:
+    # A new contact is created for every collision, so keep them small
+    __slots__ = ('normal', 'overlap', 'point', 'inherited_offset')
+    # resolved contacts, waiting to be reused
+    pool = ObjectPool(16)
+
     def __init__(self, normal: Vector2, overlap: float, point: Vector2):
         self.normal = normal
         self.overlap = overlap
         self.point = point
         self.inherited_offset = Vector2(0, 0)
 
+    # Reuse a pooled contact when possible (same arguments as the constructor)
+    @classmethod
+    def acquire(cls, normal: Vector2, overlap: float, point: Vector2) -> 'CollisionInfo':
+        info = cls.pool.acquire()
+        if (info is None):
+            return cls(normal, overlap, point)
+        info.normal = normal
+        info.overlap = overlap
+        info.point = point
+        info.inherited_offset.update(0, 0)
+        return info
+
+    # The contact's vectors may still be referenced elsewhere, so they are replaced on reuse, never modified
+    @classmethod
+    def release(cls, info: 'CollisionInfo'):
+        cls.pool.release(info)
+
     # Resolve collision fully
     def get_offset_out(self):
         return self.normal * (self.overlap + Collider.SkinWidth)
@@ -22,6 +45,9 @@ class CollisionInfo:
 # A helper class to compute collisions
 
 class CollisionHandler:
+    # circles with the same center have no direction between them: push the first one up
+    coincident_normal = (0, -1)
+
     # A general method for handling collisions where circ is the colliding object (ie. the player)
     @classmethod
     def circle_collision(cls, circ: CircleCollider, other: Collider) -> CollisionInfo:
@@ -44,8 +70,8 @@ class CollisionHandler:
             return None
         
         d = math.sqrt(d2)
-        n = (c1.pos - c2.pos) / d
-        return CollisionInfo(n, radii - d, c1.pos - n * (d - c2.radius))
+        n = Vector2(cls.coincident_normal) if d == 0 else (c1.pos - c2.pos) / d
+        return CollisionInfo.acquire(n, radii - d, c1.pos - n * (d - c2.radius))
     
     @classmethod
     def circle_polygon(cls, c: CircleCollider, p: PolygonCollider):
@@ -57,29 +83,95 @@ class CollisionHandler:
         if (cls.point_in_polygon(p, c.pos)):
             return None # Unimplemented
 
+        # read the cached world space arrays once
+        vertices = p.vertices
+        normals = p.normals
+        degree = p.degree
+
         # go over edges
-        for i in range(p.degree):
-            v0 = p.vertices[i]
-            v1 = p.vertices[(i + 1) % p.degree]
-            n = p.normals[i]
+        for i in range(degree):
+            v0 = vertices[i]
+            v1 = vertices[(i + 1) % degree]
+            n = normals[i]
             l = cls.point_line_segment_dist(v0, v1, c.pos)
             if (l < 0 or l > c.radius):
                 continue
-            return CollisionInfo(n, c.radius - l, c.pos - n * l)
+            return CollisionInfo.acquire(n, c.radius - l, c.pos - n * l)
         
         # go over vertices
-        for v in p.vertices:
+        for v in vertices:
             if (cls.point_in_circle(c, v)):
-                return CollisionInfo(Vector2.normalize(c.pos - v), c.radius - Vector2.length(c.pos - v), v)
+                return CollisionInfo.acquire(Vector2.normalize(c.pos - v), c.radius - Vector2.length(c.pos - v), v)
 
         # no collision
         return None
 
+    # Continuous collision: how far along its motion [0, 1] the circle gets before hitting other (None = no hit)
+    # The circle stops SkinWidth inside the collider, so the discrete test picks up the contact afterwards
+    # Colliders the circle already touches are left to the discrete test
+    @classmethod
+    def sweep_circle(cls, circ: CircleCollider, motion: Vector2, other: Collider) -> float:
+        if (isinstance(other, CircleCollider)):
+            return cls.__sweep_point(circ.pos, motion, other.pos, circ.radius + other.radius)
+        return cls.__sweep_polygon(circ, motion, other)
+
+    @classmethod
+    def __sweep_polygon(cls, c: CircleCollider, motion: Vector2, p: PolygonCollider) -> float:
+        vertices = p.vertices
+        normals = p.normals
+        degree = p.degree
+        toi = None
+
+        # the circle's front meets an edge
+        for i in range(degree):
+            t = cls.__sweep_edge(c, motion, vertices[i], vertices[(i + 1) % degree], normals[i])
+            if (t is not None and (toi is None or t < toi)):
+                toi = t
+
+        # the circle meets a vertex
+        for v in vertices:
+            t = cls.__sweep_point(c.pos, motion, v, c.radius)
+            if (t is not None and (toi is None or t < toi)):
+                toi = t
+        return toi
+
+    # When does the circle's front meet the edge v0 -> v1 with outward normal n (None = never or already touches)
+    @classmethod
+    def __sweep_edge(cls, c: CircleCollider, motion: Vector2, v0: Vector2, v1: Vector2, n: Vector2) -> float:
+        approach = Vector2.dot(motion, n)
+        dist = Vector2.dot(c.pos - v0, n)
+        if (approach >= 0 or dist < c.radius):
+            return None
+        t = (c.radius - Collider.SkinWidth - dist) / approach
+        if (t > 1):
+            return None
+        # the point of contact must lie on the edge itself
+        edge = v1 - v0
+        along = Vector2.dot(c.pos + motion * t - v0, edge)
+        return t if 0 <= along <= edge.length_squared() else None
+
+    # When does a point moving from pos along motion get within distance of center (None = never or already is)
+    @classmethod
+    def __sweep_point(cls, pos: Vector2, motion: Vector2, center: Vector2, distance: float) -> float:
+        d = pos - center
+        b = Vector2.dot(d, motion)
+        if (b >= 0 or Vector2.length_squared(d) < distance**2):
+            return None
+        target = distance - Collider.SkinWidth
+        a = Vector2.length_squared(motion)
+        discriminant = b * b - a * (Vector2.length_squared(d) - target**2)
+        if (discriminant < 0):
+            return None
+        t = (-b - math.sqrt(discriminant)) / a
+        return t if t <= 1 else None
+
     # Does a given point v lie within the polygon collider p
     @classmethod
     def point_in_polygon(cls, p: PolygonCollider, v: Vector2) -> bool:
+        vertices = p.vertices
+        normals = p.normals
         for i in range(p.degree):
-            if (Vector2.dot(p.vertices[i] - v, p.normals[i]) < 0):
+            if (Vector2.dot(vertices[i] - v, normals[i]) < 0):
                 return False
         return True
 
@@ -1,7 +1,6 @@
 import pygame
 from pygame.math import Vector2
-from utils.data.time import Time
-from utils.game_state import GameStateHandler
+from utils.input_source import InputSource, KeyboardInput
 from utils.data.statistics import DeathType
 from physics.collisionhandler import CollisionInfo
 from entities.entity import Entity
@@ -9,10 +8,22 @@ from entities.entity import Entity
 # Handles player movement and response to physics
 
 class PlayerController:
-    def __init__(self, entity: Entity):
+    # Movement constants (read when a controller is created, so they can be tuned without editing the code)
+    max_speed = 300
+    # seconds from standstill to max_speed
+    accel_time = 0.15
+    friction = 1 / 10
+    max_jump_height = 300
+    max_jump_time = 1.2
+    terminal_vel = 1500
+
+    def __init__(self, world, entity: Entity, input_source: InputSource = None):
         """Component, which transforms keyboard input to physics movement."""
+        self.world = world
         # parent
         self.entity = entity
+        # where the input comes from (keyboard by default)
+        self.input_source = KeyboardInput() if input_source is None else input_source
 
         # state variables
         self.__input = 0
@@ -21,9 +32,9 @@ class PlayerController:
         self.__can_jump = False
 
         # movement variables
-        self.__max_speed = 300
-        self.__accel = self.__max_speed / 0.15
-        self.__friction = 1 / 10
+        self.__max_speed = self.max_speed
+        self.__accel = self.__max_speed / self.accel_time
+        self.__friction = self.friction
         self.__initialize_gravity()
 
         # vel (world space), surface_vel (surface space)
@@ -37,9 +48,9 @@ class PlayerController:
     
     # Compute required gravity & jump_force using parabola math
     def __initialize_gravity(self):
-        max_jump_height = 300
-        max_jump_time = 1.2
-        self.__terminal_vel = 1500
+        max_jump_height = self.max_jump_height
+        max_jump_time = self.max_jump_time
+        self.__terminal_vel = self.terminal_vel
 
         time_to_apex = max_jump_time / 2
         self.__gravity = 2 * max_jump_height / (time_to_apex**2)
@@ -54,6 +65,18 @@ class PlayerController:
         
         self.__is_grounded = False
 
+    # The internal state of the controller, for saving & restoring the simulation
+    def get_state(self) -> tuple:
+        return (Vector2(self.vel), Vector2(self.__surface_vel), self.__input, self.__jump_pressed,
+                self.__is_grounded, self.__can_jump, self.collision_point, list(self.__collision_buffer))
+
+    def set_state(self, state: tuple):
+        vel, surface_vel, self.__input, self.__jump_pressed, \
+            self.__is_grounded, self.__can_jump, self.collision_point, buffer = state
+        self.vel = Vector2(vel)
+        self.__surface_vel = Vector2(surface_vel)
+        self.__collision_buffer = list(buffer)
+
 # - - - - Ground Update - - - -
 
     def __grounded_update(self):
@@ -69,28 +92,21 @@ class PlayerController:
         # transformation from surface to world space
         self.vel = self.entity.obj_to_world(self.__surface_vel)
 
-    # Horizontal input: arrow keys, A and D
-    # Jump: space
+    # Read the current frame's input from the input source
     def __read_input(self):
-        self.__input = 0
-        keys = pygame.key.get_pressed()
-
-        if (keys[pygame.K_a] or keys[pygame.K_LEFT]):
-            self.__input -= 1
-        if (keys[pygame.K_d] or keys[pygame.K_RIGHT]):
-            self.__input += 1
-        
-        self.__jump_pressed = keys[pygame.K_SPACE]
+        state = self.input_source.state
+        self.__input = state.horizontal
+        self.__jump_pressed = state.jump
 
     # Accelerate when input exists
     def __apply_horizontal_accel(self):
         if (self.__input == 0):
             return
-        self.__surface_vel.x += self.__input * self.__accel * Time.dt
+        self.__surface_vel.x += self.__input * self.__accel * self.world.time.dt
     
-    # Decelerate the player
+    # Decelerate the player (friction is defined per 1/60 s, so it is independent of the physics rate)
     def __apply_friction(self):
-        self.__surface_vel.x *= (1 - self.__friction)
+        self.__surface_vel.x *= (1 - self.__friction) ** (self.world.time.dt * 60)
     
     def __clamp_velocity(self):
         # the speed of the player should not exceed max_speed
@@ -129,7 +145,7 @@ class PlayerController:
 
     def __apply_gravity(self):
         # apply downwards acceleration always in the direction of the positive y-axis
-        self.vel.y += self.__gravity * Time.dt
+        self.vel.y += self.__gravity * self.world.time.dt
         # make sure the player doesn't accelerate too much
         self.vel.y = min(self.vel.y, self.__terminal_vel)
 
@@ -153,13 +169,13 @@ class PlayerController:
         
         # are you forced between a rock and a hard place?
         if (self.is_squished()):
-            GameStateHandler.on_gameover(DeathType.SQUISH)
+            self.world.game_state.on_gameover(DeathType.SQUISH)
             return
         
         # just push the player out of collision if stationary
         if (self.vel == Vector2(0, 0)):
             for c in self.__collision_buffer:
-                self.entity.coll.pos += c.get_offset_out()
+                self.entity.translate(c.get_offset_out())
             return
 
         # find the ideal collision
@@ -190,8 +206,11 @@ class PlayerController:
         # remove all vertical velocity upon collision with a surface
         self.vel = Vector2.dot(self.vel, self.entity.right) * self.entity.right
 
-        self.collision_point = info.point
+        # copied, since the point may be a vertex shared with the collider
+        self.collision_point = Vector2(info.point)
         self.__is_grounded = True
 
-        # reset buffer
+        # reset buffer & hand the resolved contacts back to the pool
+        for c in self.__collision_buffer:
+            CollisionInfo.release(c)
         self.__collision_buffer.clear()
@@ -0,0 +1,60 @@
+import math
+from pygame.math import Vector2
+from physics.colliders import PolygonShape
+
+# Caches the shapes of regular polygons, so colliders with the same shape share their local data
+
+class ShapeTemplates:
+    """
+    Regular polygon shapes keyed by (vertex count, size, angle bucket).\n
+    The rotation is quantized into angle_buckets steps per quarter turn, so similar polygons share a template.
+    """
+    angle_buckets = 32
+    # the oldest template is dropped once the cache is full
+    max_templates = 4096
+
+    __templates: dict[tuple, PolygonShape] = {}
+    hits = 0
+    misses = 0
+
+    # n = vertex count, size = distance of the vertices from the center, angle = rotation in radians
+    @classmethod
+    def regular_polygon(cls, n: int, size: int, angle: float) -> PolygonShape:
+        key = (n, size, cls.angle_bucket(angle))
+        shape = cls.__templates.get(key)
+        if (shape is not None):
+            cls.hits += 1
+            return shape
+
+        cls.misses += 1
+        offset_angle = key[2] * math.pi / 2 / cls.angle_buckets
+        verts = []
+        for i in range(n):
+            a = math.pi * 2 / n * i + offset_angle
+            verts.append(Vector2(math.cos(a), math.sin(a)) * size)
+        shape = PolygonShape(verts)
+        if (len(cls.__templates) >= cls.max_templates):
+            del cls.__templates[next(iter(cls.__templates))]
+        cls.__templates[key] = shape
+        return shape
+
+    # Index of the quarter turn bucket the angle falls in
+    @classmethod
+    def angle_bucket(cls, angle: float) -> int:
+        quarter = math.pi / 2
+        return int((angle % quarter) / quarter * cls.angle_buckets) % cls.angle_buckets
+
+    @classmethod
+    def hit_rate(cls) -> float:
+        total = cls.hits + cls.misses
+        return cls.hits / total if total > 0 else 0
+
+    @classmethod
+    def clear(cls):
+        cls.__templates.clear()
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def count(cls) -> int:
+        return len(cls.__templates)
@@ -0,0 +1,65 @@
+from pygame.rect import Rect
+
+# A uniform grid, which maps areas of world space to the items overlapping them
+
+class SpatialHash:
+    def __init__(self, cell_size: int):
+        """
+        Broad phase structure for finding items near a given area.\n
+        cell_size = width & height of a single grid cell
+        """
+        self.cell_size = cell_size
+        # cell coordinates -> items in the cell (dicts keep the insertion order deterministic)
+        self.__cells: dict[tuple, dict] = {}
+        # item -> the range of cells it currently occupies
+        self.__ranges: dict = {}
+
+    def __len__(self) -> int:
+        return len(self.__ranges)
+
+    def __contains__(self, item) -> bool:
+        return item in self.__ranges
+
+    # The inclusive range of cells a rect overlaps (right & bottom of a Rect are exclusive)
+    def __cell_range(self, rect: Rect) -> tuple:
+        s = self.cell_size
+        return (rect.left // s, rect.top // s,
+                max(rect.right - 1, rect.left) // s, max(rect.bottom - 1, rect.top) // s)
+
+    def insert(self, item, rect: Rect):
+        cell_range = self.__cell_range(rect)
+        self.__ranges[item] = cell_range
+        for x in range(cell_range[0], cell_range[2] + 1):
+            for y in range(cell_range[1], cell_range[3] + 1):
+                self.__cells.setdefault((x, y), {})[item] = None
+
+    def remove(self, item):
+        cell_range = self.__ranges.pop(item)
+        for x in range(cell_range[0], cell_range[2] + 1):
+            for y in range(cell_range[1], cell_range[3] + 1):
+                cell = self.__cells[(x, y)]
+                del cell[item]
+                if (len(cell) == 0):
+                    del self.__cells[(x, y)]
+
+    # Call after the item has moved; cheap when it stays within the same cells
+    def update(self, item, rect: Rect):
+        if (self.__ranges[item] == self.__cell_range(rect)):
+            return
+        self.remove(item)
+        self.insert(item, rect)
+
+    # All items in the cells the rect overlaps (a superset of the items actually overlapping it)
+    def query(self, rect: Rect) -> list:
+        cell_range = self.__cell_range(rect)
+        found = {}
+        for x in range(cell_range[0], cell_range[2] + 1):
+            for y in range(cell_range[1], cell_range[3] + 1):
+                cell = self.__cells.get((x, y))
+                if (cell is not None):
+                    found.update(cell)
+        return list(found)
+
+    def clear(self):
+        self.__cells.clear()
+        self.__ranges.clear()
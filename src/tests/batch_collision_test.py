@@ -0,0 +1,53 @@
+import math
+import random
+import unittest
+from pygame.math import Vector2
+from physics.colliders import CircleCollider, PolygonCollider
+from physics.collisionhandler import CollisionHandler
+from physics.batch_collision import BatchCollisionHandler
+from tests.helpers import simulate_run
+
+class TestBatchCollision(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.colliders = []
+        for _ in range(300):
+            pos = Vector2(rng.uniform(0, 600), rng.uniform(0, 600))
+            size = rng.randint(25, 150)
+            if (rng.random() < 0.5):
+                self.colliders.append(CircleCollider(pos, size))
+                continue
+            n = rng.randint(3, 8)
+            offset = rng.random() * math.pi / 2
+            self.colliders.append(PolygonCollider(pos, [
+                Vector2(math.cos(math.pi * 2 / n * i + offset), math.sin(math.pi * 2 / n * i + offset)) * size
+                for i in range(n)]))
+
+    def test_batch_matches_single_tests(self):
+        hits = 0
+        for x in range(0, 600, 37):
+            circ = CircleCollider(Vector2(x, 300), 30)
+            batch = BatchCollisionHandler.circle_collision(circ, self.colliders)
+            for coll, info in zip(self.colliders, batch):
+                expected = CollisionHandler.circle_collision(circ, coll)
+                if (expected is None):
+                    self.assertIsNone(info)
+                    continue
+                hits += 1
+                self.assertAlmostEqual(info.overlap, expected.overlap)
+                self.assertAlmostEqual(info.normal.x, expected.normal.x)
+                self.assertAlmostEqual(info.normal.y, expected.normal.y)
+                self.assertAlmostEqual(info.point.distance_to(expected.point), 0)
+        self.assertGreater(hits, 0)
+
+    def test_coincident_circles_have_a_normal(self):
+        circ = CircleCollider(Vector2(100, 100), 30)
+        other = CircleCollider(Vector2(100, 100), 50)
+        expected = CollisionHandler.circle_collision(circ, other)
+        info = BatchCollisionHandler.circle_collision(circ, [other])[0]
+        self.assertEqual(expected.normal, Vector2(0, -1))
+        self.assertEqual(info.normal, expected.normal)
+        self.assertAlmostEqual(info.overlap, expected.overlap)
+
+    def test_batched_game_matches_grid_game(self):
+        self.assertEqual(simulate_run('batch_threshold', 1), simulate_run('batch_threshold', None))
@@ -0,0 +1,28 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from benchmarks import suite
+from benchmarks.suite import compare, main
+
+class TestBenchComparison(unittest.TestCase):
+    def test_only_slowdowns_beyond_tolerance_regress(self):
+        baseline = {'a': 1.0, 'b': 1.0, 'c': 1.0}
+        results = {'a': 1.1, 'b': 1.3, 'c': 0.5, 'd': 9.0}
+        self.assertEqual(compare(results, baseline, 0.2), ['b'])
+
+    def test_missing_baseline_fails(self):
+        with tempfile.TemporaryDirectory() as directory:
+            argv = ['--frames', '10', '--output', os.path.join(directory, 'results.json'),
+                    '--baseline', os.path.join(directory, 'baseline.json')]
+            # the benchmarks themselves aren't run
+            run = suite.run
+            suite.run = lambda frames: {'a': 1.0}
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.assertNotEqual(main(argv), 0)
+                    self.assertEqual(main(argv + ['--save-baseline']), 0)
+                    self.assertEqual(main(argv), 0)
+            finally:
+                suite.run = run
@@ -1,6 +1,7 @@
 import unittest
 from physics.colliders import CircleCollider, PolygonCollider
 from physics.collisionhandler import CollisionHandler
+from physics.shape_templates import ShapeTemplates
 from pygame.math import Vector2
 import math
 
@@ -17,3 +18,34 @@ class TestCollision(unittest.TestCase):
     def test_circle_poly_collision(self):
         v = CollisionHandler.circle_polygon(self.c1, self.poly)
         self.assertNotEqual(v, None)
+
+    def test_poly_vertices_follow_translation(self):
+        before = self.poly.vertices[0]
+        self.poly.translate(Vector2(10, 0))
+        self.assertEqual(self.poly.vertices[0], before + Vector2(10, 0))
+
+    def test_bounds_follow_translation(self):
+        self.c1.translate(Vector2(10, -20))
+        self.assertEqual(self.c1.tight_bounds.topleft, (410, 380))
+        self.assertEqual(self.c1.bounds.topleft, (407, 377))
+
+    def test_shape_template_is_shared(self):
+        shape = ShapeTemplates.regular_polygon(5, 100, 0)
+        self.assertIs(ShapeTemplates.regular_polygon(5, 100, 0.001), shape)
+        p1 = PolygonCollider.from_shape(Vector2(650, 500), shape)
+        p2 = PolygonCollider.from_shape(Vector2(0, 0), shape)
+        self.assertIs(p1.local_vertices, p2.local_vertices)
+        self.assertEqual(p1.vertices, self.poly.vertices)
+        self.assertEqual(p1.normals, self.poly.normals)
+
+    def test_sweep_stops_before_tunneling(self):
+        small = CircleCollider(Vector2(500, 700), 25)
+        motion = Vector2(0, 400)
+        self.assertIsNone(CollisionHandler.circle_circle(CircleCollider(Vector2(500, 900), 100), small))
+        t = CollisionHandler.sweep_circle(self.c1, motion, small)
+        self.assertAlmostEqual(500 + motion.y * t, 700 - 124)
+
+        square = PolygonCollider(Vector2(500, 700), [Vector2(-25, -25), Vector2(25, -25), Vector2(25, 25), Vector2(-25, 25)])
+        t = CollisionHandler.sweep_circle(self.c1, motion, square)
+        self.assertAlmostEqual(500 + motion.y * t, 700 - 25 - 99)
+        self.assertIsNone(CollisionHandler.sweep_circle(self.c1, -motion, square))
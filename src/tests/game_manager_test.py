@@ -0,0 +1,63 @@
+import unittest
+from utils.game_manager import GameManager
+from utils.game_state import State
+from utils.environment.platform_manager import PlatformManager
+from utils.input_source import InputState, ScriptedInput
+from pygame.math import Vector2
+from entities.platform import Platform
+from physics.colliders import PolygonCollider
+from physics.shape_templates import ShapeTemplates
+from utils.settings import Settings
+
+# Where the player is after falling at terminal velocity onto a small platform at 10 physics steps per second
+def fall_onto_small_platform(continuous: bool) -> float:
+    game = GameManager(headless=True, settings=Settings(physics_rate=10, continuous_collision=continuous, seed=1))
+    coll = PolygonCollider.from_shape(Vector2(605, 880), ShapeTemplates.regular_polygon(4, 25, 0.3))
+    game.world.platforms.load_platforms([Platform(True, coll, (0, 0, 0))], 1)
+    game.player.controller.vel = Vector2(0, 1500)
+    game.simulate(3)
+    return game.player.coll.pos.y
+
+def platform_layout(seed: int, frames: int) -> list:
+    game = GameManager(headless=True, settings=Settings(seed=seed))
+    game.simulate(frames)
+    return [(tuple(p.coll.pos), tuple(p.vel), p.is_static) for p in game.world.platforms.current_platforms]
+
+class TestHeadless(unittest.TestCase):
+    def test_idle_player_survives(self):
+        game = GameManager(headless=True)
+        self.assertEqual(game.simulate(300), 300)
+        self.assertEqual(game.world.state, State.RUNNING)
+
+    def test_walking_off_the_platform_ends_the_game(self):
+        game = GameManager(headless=True, input_source=ScriptedInput([InputState(right=True)], loop=True))
+        frames = game.simulate(5000)
+        self.assertLess(frames, 5000)
+        self.assertEqual(game.world.state, State.ENDED)
+
+    def test_same_seed_generates_the_same_level(self):
+        self.assertEqual(platform_layout(7, 600), platform_layout(7, 600))
+        self.assertNotEqual(platform_layout(7, 600), platform_layout(8, 600))
+
+    def test_off_screen_platforms_are_unloaded_on_the_next_step(self):
+        default_delay = PlatformManager.spawn_delay
+        PlatformManager.spawn_delay = 0.5
+        try:
+            game = GameManager(headless=True, settings=Settings(seed=6))
+            platforms = game.world.platforms
+            camera = game.world.camera
+            for _ in range(900):
+                # dynamic platforms spawn off-screen, so only the ones moving away count
+                off_screen = [p.spawn_id for p in platforms.current_platforms
+                              if p.coll.bounds.top > camera.bottom() or (p.vel.x < 0 and p.coll.bounds.right < 0)
+                              or (p.vel.x > 0 and p.coll.bounds.left > camera.right())]
+                game.simulate(1)
+                alive = [p.spawn_id for p in platforms.current_platforms]
+                self.assertFalse(set(off_screen) & set(alive))
+            self.assertLess(len(platforms.current_platforms), platforms.spawn_count)
+        finally:
+            PlatformManager.spawn_delay = default_delay
+
+    def test_continuous_collision_prevents_tunneling(self):
+        self.assertGreater(fall_onto_small_platform(False), 880)
+        self.assertLess(fall_onto_small_platform(True), 880)
@@ -0,0 +1,26 @@
+from utils.world import World
+from utils.game_manager import GameManager
+from utils.environment.platform_manager import PlatformManager
+from utils.settings import Settings
+from benchmarks.rollout import bot_input
+
+# Shared by the tests, which compare whole runs
+
+def world_summary(world: World) -> list:
+    return [tuple(world.player.coll.pos), tuple(world.player.controller.vel), world.time.time,
+            tuple(world.offset), world.stats.score] + \
+           [(tuple(p.coll.pos), tuple(p.vel), p.is_static) for p in world.platforms.current_platforms]
+
+# Summary of a seeded bot run, with a PlatformManager attribute overridden (ie. a threshold)
+def simulate_run(attribute: str, value) -> list:
+    default = getattr(PlatformManager, attribute)
+    setattr(PlatformManager, attribute, value)
+    try:
+        game = GameManager(headless=True, input_source=bot_input(), settings=Settings(seed=1))
+        game.simulate(900)
+        summary = world_summary(game.world)
+        # pooled platforms go back (ie. ones attached to a PlatformStore)
+        game.world.platforms.reset()
+    finally:
+        setattr(PlatformManager, attribute, default)
+    return summary
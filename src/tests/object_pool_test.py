@@ -0,0 +1,32 @@
+import unittest
+from pygame.math import Vector2
+from physics.colliders import CircleCollider
+from entities.platform import Platform
+from utils.object_pool import ObjectPool
+
+class TestObjectPool(unittest.TestCase):
+    def test_pool_is_bounded(self):
+        pool = ObjectPool(2)
+        self.assertIsNone(pool.acquire())
+        for i in range(3):
+            pool.release(i)
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.dropped, 1)
+        self.assertEqual(pool.acquire(), 1)
+        self.assertEqual(pool.hit_rate, 0.5)
+
+    def test_reused_platform_is_reset(self):
+        Platform.pool.clear()
+        CircleCollider.pool.clear()
+        platform = Platform(False, CircleCollider(Vector2(0, 0), 10), (0, 0, 0))
+        platform.vel = Vector2(100, 0)
+        platform.spawn_id = 5
+        Platform.release(platform)
+
+        reused = Platform.acquire(True, CircleCollider.acquire(Vector2(50, 60), 20), (1, 1, 1))
+        self.assertIs(reused, platform)
+        self.assertEqual(reused.vel, Vector2(0, 0))
+        self.assertEqual(reused.spawn_id, 0)
+        self.assertEqual(reused.prev_pos, Vector2(50, 60))
+        self.assertEqual(reused.coll.tight_bounds.topleft, (30, 40))
+        self.assertEqual(reused.coll.radius, 20)
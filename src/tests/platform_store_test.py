@@ -0,0 +1,40 @@
+import unittest
+from pygame.math import Vector2
+from physics.colliders import CircleCollider
+from entities.platform import Platform
+from utils.environment.platform_store import PlatformStore
+from tests.helpers import simulate_run
+
+class TestPlatformStore(unittest.TestCase):
+    def setUp(self):
+        self.store = PlatformStore(200, capacity=1)
+        self.platforms = []
+        for i in range(3):
+            p = Platform(i == 0, CircleCollider(Vector2(100 * i, 0), 25), (0, 0, 0))
+            p.attach(self.store, self.store.add(p, Vector2(10, 0)))
+            self.platforms.append(p)
+
+    def test_move_updates_dynamic_platforms_only(self):
+        self.store.move(0.5)
+        self.assertEqual(self.platforms[0].coll.pos, Vector2(0, 0))
+        self.assertEqual(self.platforms[2].coll.pos, Vector2(205, 0))
+        self.assertEqual(tuple(self.store.bounds[2]), (177, -28, 233, 28))
+
+    def test_velocity_is_a_copy_and_assignments_reach_the_store(self):
+        stored = self.platforms[1]
+        unstored = Platform(False, CircleCollider(Vector2(0, 0), 25), (0, 0, 0))
+        for p in (stored, unstored):
+            p.vel.x = 99
+            self.assertEqual(p.vel, Vector2(10, 0) if p is stored else Vector2(0, 0))
+            p.vel = Vector2(-5, 0)
+            self.assertEqual(p.vel, Vector2(-5, 0))
+        self.assertEqual(tuple(self.store.vel[stored.row]), (-5, 0))
+
+    def test_remove_keeps_rows_contiguous(self):
+        moved = self.store.remove(0)
+        self.assertIs(moved, self.platforms[2])
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(tuple(self.store.pos[0]), (200, 0))
+
+    def test_stored_game_matches_unstored_game(self):
+        self.assertEqual(simulate_run('store_threshold', 0), simulate_run('store_threshold', 10**6))
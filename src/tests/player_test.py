@@ -2,10 +2,11 @@ import unittest
 from entities.player import Player
 from physics.collisionhandler import CollisionInfo
 from pygame.math import Vector2
+from utils.world import World
 
 class TestCollision(unittest.TestCase):
     def setUp(self):
-        self.player = Player(Vector2(500, 500), 100)
+        self.player = Player(World(1200, 1000), Vector2(500, 500), 100)
         self.info = CollisionInfo(Vector2(1, 0), 5, Vector2(0, 0))
 
     def test_collision_response(self):
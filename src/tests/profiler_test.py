@@ -0,0 +1,34 @@
+import json
+import os
+import tempfile
+import unittest
+from utils.game_manager import GameManager
+from utils.profiler import Profiler
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        Profiler.clear()
+
+    def tearDown(self):
+        Profiler.enabled = False
+        Profiler.capacity = 600
+        Profiler.clear()
+
+    def test_ring_buffer_keeps_the_newest_samples(self):
+        Profiler.capacity = 4
+        for ms in range(6):
+            Profiler.record('phase', ms)
+        self.assertEqual(Profiler.samples('phase'), [2, 3, 4, 5])
+        self.assertEqual(Profiler.percentiles('phase'), (4, 5, 5))
+
+    def test_enabled_profiler_times_every_phase(self):
+        Profiler.enabled = True
+        GameManager(headless=True).simulate(10)
+        self.assertEqual(len(Profiler.phases()), 5)
+        self.assertEqual(len(Profiler.samples('PlatformManager.update')), 10)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.json')
+            Profiler.dump(path)
+            with open(path, 'r', encoding='utf-8') as source:
+                self.assertEqual(len(json.loads(source.read())['player.update']['samples']), 10)
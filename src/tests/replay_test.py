@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from utils.game_manager import GameManager
+from utils.data.replay import Replay
+from utils.data.world_state import WorldState
+from utils.settings import Settings
+from benchmarks.rollout import bot_input
+from tests.helpers import world_summary
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.game = GameManager(headless=True, input_source=bot_input(),
+                                settings=Settings(seed=3, replay_dir="unused"))
+        self.game.recorder.keyframe_interval = 100
+        self.frames = self.game.simulate(900)
+        self.expected = world_summary(self.game.world)
+        self.replay = Replay.from_bytes(self.game.recorder.to_replay().to_bytes())
+
+    def test_replay_reproduces_the_run(self):
+        game = GameManager.from_replay(self.replay)
+        game.simulate(self.frames)
+        self.assertEqual(world_summary(game.world), self.expected)
+
+    def test_seeking_from_a_keyframe_matches_the_run(self):
+        game = GameManager.from_replay(self.replay, self.frames - 50)
+        game.simulate(50)
+        self.assertEqual(world_summary(game.world), self.expected)
+
+    def test_runs_with_the_same_seed_are_saved_separately(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.game.settings.replay_dir = directory
+            first = self.game.save_replay()
+            second = self.game.save_replay()
+            self.assertNotEqual(first, second)
+            self.assertEqual(len(os.listdir(directory)), 2)
+            self.assertEqual(Replay.load(second).seed, 3)
+
+    def test_seed_must_fit_the_header(self):
+        with self.assertRaises(ValueError):
+            GameManager(headless=True, settings=Settings(seed=2**32, replay_dir="unused"))
+
+    def test_seeking_restores_the_run_start(self):
+        self.game.world.run_start = 1.5
+        replay = Replay(3, self.game.world.time.dt, keyframes=[(0, WorldState.capture(self.game.world))])
+        game = GameManager.from_replay(replay)
+        self.assertEqual(game.world.run_start, 1.5)
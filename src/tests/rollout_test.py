@@ -0,0 +1,29 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from benchmarks.rollout import RolloutStats, main, rollout, run_seed
+
+class TestRollout(unittest.TestCase):
+    def test_pooled_runs_match_single_runs(self):
+        results = sorted(rollout(range(4), 300, workers=2), key=lambda r: r['seed'])
+        self.assertEqual(results, [run_seed(seed, 300) for seed in range(4)])
+
+    def test_unknown_tunable_is_rejected(self):
+        with self.assertRaises(ValueError):
+            list(rollout(range(1), 10, {'PlatformManager.no_such_constant': 1}))
+
+    def test_stats_aggregate_runs(self):
+        stats = RolloutStats(bucket=10)
+        for score, death in ((5, 'fall'), (12, 'fall'), (18, 'squish'), (40, None)):
+            stats.add({'seed': 0, 'score': score, 'frames': 100, 'death': death, 'platforms': 4})
+        summary = stats.summary()
+        self.assertEqual(summary['score_histogram'], {0: 1, 10: 2, 40: 1})
+        self.assertEqual(summary['death_ratios'], {'fall': 0.5, 'squish': 0.25, 'survived': 0.25})
+        self.assertEqual(summary['score_percentiles']['p50'], 18)
+
+    def test_no_runs_is_reported(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(main(['--runs', '0', '--output', os.path.join(directory, 'results.json')]), 0)
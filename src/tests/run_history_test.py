@@ -0,0 +1,35 @@
+import random
+import statistics
+import unittest
+from utils.data.run_history import QuantileSketch, RunHistory, RunningStats
+
+class TestRunHistory(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.values = [int(rng.expovariate(1 / 40)) for _ in range(5000)]
+
+    def test_running_stats_match_the_exact_ones(self):
+        stats = RunningStats()
+        for x in self.values:
+            stats.add(x)
+        self.assertAlmostEqual(stats.mean, statistics.fmean(self.values))
+        self.assertAlmostEqual(stats.variance, statistics.pvariance(self.values), 6)
+
+    def test_sketch_quantiles_are_within_the_relative_error(self):
+        sketch = QuantileSketch(0.01)
+        for x in self.values:
+            sketch.add(x)
+        ordered = sorted(self.values)
+        for q in (0.5, 0.9, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), 0.01 * exact)
+        self.assertLess(len(sketch.buckets), 1024)
+
+    def test_history_round_trips(self):
+        history = RunHistory()
+        for score, height in ((12, 3), (40, 31), (7, -4)):
+            history.add(score, height)
+        restored = RunHistory.from_dict(history.to_dict())
+        self.assertEqual(restored.to_dict(), history.to_dict())
+        self.assertEqual(restored.death_bands, {-10: 1, 0: 1, 30: 1})
+        self.assertEqual(restored.summary()['runs'], 3)
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from utils.data.save_data import SaveManager
+from utils.data.run_history import RunHistory
+
+def run(score: int, death: str = 'fall') -> dict:
+    return {'score': score, 'death': death, 'duration': 12.5, 'seed': 7, 'height': score - 3}
+
+def counts() -> dict:
+    totals = SaveManager.load()
+    return {k: totals[k] for k in ('highscore', 'fall_count', 'squish_count', 'runs')}
+
+# Another session: appends count runs, compacting after every few
+def other_session(directory: str, count: int) -> int:
+    SaveManager.directory = directory
+    for i in range(count):
+        SaveManager.append_run(run(i))
+        if (i % 5 == 4):
+            SaveManager.compact()
+    return count
+
+class TestSaveManager(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.default_directory = SaveManager.directory
+        SaveManager.directory = self.directory.name
+        self.assertIsNone(SaveManager.load())
+
+    def tearDown(self):
+        SaveManager.directory = self.default_directory
+        SaveManager.compaction_threshold = 256
+        self.directory.cleanup()
+
+    def test_runs_are_summed(self):
+        for score, death in ((5, 'fall'), (9, 'squish'), (3, 'fall')):
+            SaveManager.append_run(run(score, death))
+        self.assertEqual(counts(), {'highscore': 9, 'fall_count': 2, 'squish_count': 1, 'runs': 3})
+
+    def test_partial_last_record_is_dropped(self):
+        SaveManager.append_run(run(5))
+        with open(os.path.join(self.directory.name, 'runs.0.journal'), 'ab') as target:
+            target.write(b'{"score": 4')
+        self.assertEqual(SaveManager.load()['runs'], 1)
+        SaveManager.append_run(run(6))
+        self.assertEqual(SaveManager.load()['highscore'], 6)
+
+    def test_compaction_keeps_the_totals(self):
+        SaveManager.compaction_threshold = 2
+        SaveManager.append_run(run(5))
+        SaveManager.append_run(run(8, 'squish'))
+        self.assertEqual(SaveManager.load()['runs'], 2)
+        self.assertEqual([n for n in os.listdir(self.directory.name) if n.endswith('.journal')], [])
+
+        SaveManager.append_run(run(2))
+        self.assertEqual(counts(), {'highscore': 8, 'fall_count': 2, 'squish_count': 1, 'runs': 3})
+        history = RunHistory.from_dict(SaveManager.load()['history'])
+        self.assertAlmostEqual(history.scores.mean, 5)
+        self.assertEqual(history.death_bands, {-10: 1, 0: 2})
+
+    def test_old_save_is_loaded(self):
+        with open(os.path.join(self.directory.name, 'current_save.json'), 'w', encoding='utf-8') as target:
+            target.write(json.dumps({'highscore': 20, 'fall_count': 4, 'squish_count': 1}))
+        SaveManager.append_run(run(3, 'squish'))
+        self.assertEqual(counts(), {'highscore': 20, 'fall_count': 4, 'squish_count': 2, 'runs': 1})
+
+    def test_append_after_another_session_compacted(self):
+        SaveManager.append_run(run(5))
+        self.assertEqual(SaveManager.load()['runs'], 1)
+        with ProcessPoolExecutor(1) as executor:
+            executor.submit(other_session, self.directory.name, 5).result()
+        # this session's last load was before the compaction
+        SaveManager.append_run(run(50))
+        self.assertEqual(counts()['runs'], 7)
+        SaveManager.compact()
+        self.assertEqual(counts(), {'highscore': 50, 'fall_count': 7, 'squish_count': 0, 'runs': 7})
+
+    def test_concurrent_sessions_keep_every_run(self):
+        with ProcessPoolExecutor(2) as executor:
+            futures = [executor.submit(other_session, self.directory.name, 20) for _ in range(2)]
+            for i in range(20):
+                SaveManager.append_run(run(i))
+            total = 20 + sum(f.result() for f in futures)
+        self.assertEqual(counts()['runs'], total)
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+import unittest
+from utils.data.save_data import SaveManager
+from utils.data.save_writer import SaveWriter
+
+def run(score: int) -> dict:
+    return {'score': score, 'death': 'fall', 'duration': 1.0, 'seed': 0}
+
+class TestSaveWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.default_directory = SaveManager.directory
+        SaveManager.directory = self.directory.name
+        SaveManager.load()
+        SaveWriter.clear_stats()
+
+    def tearDown(self):
+        SaveWriter.flush(5)
+        SaveManager.directory = self.default_directory
+        SaveWriter.max_queue = 64
+        SaveWriter.stall_timeout = 0.5
+        SaveWriter.retry_delay = 1.0
+        self.directory.cleanup()
+
+    def wait_for_error(self):
+        deadline = time.perf_counter() + 5
+        while (SaveWriter.errors == 0 and time.perf_counter() < deadline):
+            time.sleep(0.01)
+        self.assertGreater(SaveWriter.errors, 0)
+
+    def test_runs_are_written_in_the_background(self):
+        for score in range(10):
+            SaveWriter.submit(run(score))
+        self.assertTrue(SaveWriter.flush(5))
+        self.assertEqual(SaveWriter.records, 10)
+        self.assertEqual(SaveManager.load()['runs'], 10)
+
+    def test_full_queue_stalls_and_pending_runs_are_coalesced(self):
+        SaveWriter.max_queue = 2
+        append_runs = SaveManager.append_runs
+        def slow_append(runs: list):
+            time.sleep(0.05)
+            append_runs(runs)
+        SaveManager.append_runs = slow_append
+        try:
+            for score in range(6):
+                SaveWriter.submit(run(score))
+            self.assertTrue(SaveWriter.flush(5))
+        finally:
+            SaveManager.append_runs = append_runs
+        self.assertGreater(SaveWriter.stalls, 0)
+        self.assertLess(SaveWriter.writes, 6)
+        self.assertEqual(SaveManager.load()['runs'], 6)
+
+    def test_invalid_run_is_rejected_before_queueing(self):
+        with self.assertRaises(ValueError):
+            SaveWriter.submit({'score': 1})
+        self.assertEqual(SaveWriter.queue_depth(), 0)
+
+    def test_failing_writes_keep_the_queue_bounded(self):
+        SaveWriter.max_queue = 2
+        SaveWriter.stall_timeout = 0.05
+        SaveWriter.retry_delay = 0.01
+        # the save directory is a file, so every write fails
+        blocked = os.path.join(self.directory.name, 'blocked')
+        open(blocked, 'w', encoding='utf-8').close()
+        SaveManager.directory = blocked
+        try:
+            accepted = [SaveWriter.submit(run(score)) for score in range(5)]
+            self.wait_for_error()
+            self.assertLessEqual(SaveWriter.queue_depth(), 2)
+            self.assertLessEqual(SaveWriter.max_depth, 2)
+            self.assertIn(False, accepted)
+            self.assertGreater(SaveWriter.dropped, 0)
+        finally:
+            SaveManager.directory = self.directory.name
+        self.assertTrue(SaveWriter.flush(5))
+        self.assertEqual(SaveManager.load()['runs'], SaveWriter.records)
+
+    def test_writer_survives_a_corrupt_snapshot(self):
+        SaveWriter.retry_delay = 0.01
+        snapshot = os.path.join(self.directory.name, 'current_save.json')
+        with open(snapshot, 'w', encoding='utf-8') as target:
+            target.write('{"highscore": "x", "fall_count": 0, "squish_count": 0}')
+        SaveWriter.submit(run(1))
+        self.wait_for_error()
+        os.remove(snapshot)
+        self.assertTrue(SaveWriter.flush(5))
+        self.assertEqual(SaveManager.load()['runs'], 1)
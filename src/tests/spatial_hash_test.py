@@ -0,0 +1,23 @@
+import unittest
+from pygame.rect import Rect
+from physics.spatial_hash import SpatialHash
+
+class TestSpatialHash(unittest.TestCase):
+    def setUp(self):
+        self.grid = SpatialHash(100)
+        self.grid.insert("a", Rect(10, 10, 50, 50))
+        self.grid.insert("b", Rect(350, 350, 150, 150))
+
+    def test_query_finds_nearby_items_only(self):
+        self.assertEqual(self.grid.query(Rect(0, 0, 80, 80)), ["a"])
+        self.assertEqual(self.grid.query(Rect(420, 420, 10, 10)), ["b"])
+
+    def test_update_moves_item(self):
+        self.grid.update("a", Rect(610, 10, 50, 50))
+        self.assertEqual(self.grid.query(Rect(0, 0, 80, 80)), [])
+        self.assertEqual(self.grid.query(Rect(600, 0, 80, 80)), ["a"])
+
+    def test_remove(self):
+        self.grid.remove("b")
+        self.assertEqual(len(self.grid), 1)
+        self.assertEqual(self.grid.query(Rect(0, 0, 1000, 1000)), ["a"])
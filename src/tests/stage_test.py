@@ -0,0 +1,56 @@
+import unittest
+from pygame.math import Vector2
+from pygame.surface import Surface
+from physics.shape_templates import ShapeTemplates
+from utils.gui.stage import Stage
+
+class TestStage(unittest.TestCase):
+    def setUp(self):
+        self.surf = Surface((200, 200))
+        Stage.initialize(self.surf)
+        Stage.reset_offset()
+        Stage.clear_sprites()
+
+    def test_sprites_are_cached(self):
+        Stage.draw_circle(Vector2(100, 100), 20, (255, 0, 0))
+        Stage.draw_circle(Vector2(50, 50), 20, (255, 0, 0))
+        self.assertEqual(Stage.sprite_hits, 1)
+        self.assertEqual(Stage.sprite_misses, 1)
+        self.assertEqual(tuple(self.surf.get_at((50, 50)))[:3], (255, 0, 0))
+
+    def test_off_screen_shapes_are_skipped(self):
+        Stage.draw_shape(ShapeTemplates.regular_polygon(5, 40, 0), Vector2(500, 100), (0, 255, 0))
+        Stage.interpolate(Vector2(0, -1000), Vector2(0, -1000), 1)
+        Stage.draw_circle(Vector2(100, 100), 20, (255, 0, 0))
+        self.assertEqual(Stage.sprite_misses, 0)
+
+    def test_least_recently_used_sprite_is_evicted(self):
+        default_size = Stage.sprite_cache_size
+        Stage.sprite_cache_size = 2
+        try:
+            for radius in (10, 11, 10, 12, 10):
+                Stage.draw_circle(Vector2(100, 100), radius, (255, 0, 0))
+            self.assertEqual(Stage.sprite_stats()['size'], 2)
+            self.assertEqual(Stage.sprite_misses, 3)
+        finally:
+            Stage.sprite_cache_size = default_size
+
+    def test_dirty_rects_cover_only_changes(self):
+        Stage.set_dirty_rects(True)
+        try:
+            def frame(x: int) -> list:
+                Stage.begin_frame()
+                Stage.draw_background()
+                Stage.draw_circle(Vector2(30, 30), 10, (255, 0, 0))
+                Stage.draw_circle(Vector2(x, 150), 10, (0, 0, 255))
+                return Stage.render_frame()
+
+            self.assertIsNone(frame(100))
+            self.assertEqual(frame(100), [])
+            rects = frame(130)
+            self.assertEqual(len(rects), 2)
+            self.assertFalse(any(r.collidepoint(30, 30) for r in rects))
+            self.assertEqual(tuple(self.surf.get_at((130, 150)))[:3], (0, 0, 255))
+            self.assertNotEqual(tuple(self.surf.get_at((100, 150)))[:3], (0, 0, 255))
+        finally:
+            Stage.set_dirty_rects(False)
@@ -0,0 +1,37 @@
+import unittest
+from utils.data.time import Time
+
+class FakeClock:
+    def __init__(self, ms: int):
+        self.ms = ms
+
+    def get_time(self):
+        return self.ms
+
+class TestTime(unittest.TestCase):
+    def setUp(self):
+        self.time = Time(60)
+
+    def test_steps_follow_elapsed_time(self):
+        self.time.update(FakeClock(50))
+        steps = 0
+        while (self.time.next_step()):
+            self.time.step()
+            steps += 1
+        self.assertEqual(steps, 3)
+        self.assertAlmostEqual(self.time.time, 0.05)
+        self.assertAlmostEqual(self.time.alpha, 0.0, 5)
+
+    def test_long_frames_are_clamped(self):
+        self.time.update(FakeClock(10000))
+        steps = 0
+        while (self.time.next_step()):
+            steps += 1
+        self.assertEqual(steps, 15)
+
+    def test_physics_rate_must_be_positive(self):
+        for rate in (0, -60, float('inf')):
+            with self.assertRaises(ValueError):
+                Time(rate)
+        with self.assertRaises(ValueError):
+            self.time.set_physics_rate(0)
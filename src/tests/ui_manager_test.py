@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import unittest
+from pygame import font
+from pygame.surface import Surface
+from utils.gui.stage import Stage
+from utils.gui.ui_manager import UIManager, Fonts, FontSize
+from utils.data.statistics import StatHandler
+
+class TestUIManager(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.default_cache_path = Fonts.cache_path
+        Fonts.cache_path = os.path.join(self.directory.name, "font_cache.json")
+        font.init()
+        UIManager.initialize()
+        Stage.initialize(Surface((400, 300)))
+
+    def tearDown(self):
+        Fonts.clear()
+        Fonts.cache_path = self.default_cache_path
+        self.directory.cleanup()
+
+    def test_fonts_are_loaded_on_first_use(self):
+        self.assertIsNone(Fonts.small)
+        self.assertIsNotNone(Fonts.get_font(FontSize.MEDIUM))
+        self.assertTrue(os.path.exists(Fonts.cache_path))
+
+    def test_cached_font_is_used(self):
+        path = Fonts.resolve()
+        # the font isn't looked up again
+        lookups = []
+        match_font = font.match_font
+        font.match_font = lambda name: lookups.append(name)
+        try:
+            self.assertEqual(Fonts.resolve(), path)
+        finally:
+            font.match_font = match_font
+        self.assertEqual(lookups, [])
+
+    def test_corrupt_cache_is_a_miss(self):
+        with open(Fonts.cache_path, 'w', encoding='utf-8') as target:
+            target.write('{"Arial": ')
+        path = Fonts.resolve()
+        with open(Fonts.cache_path, 'r', encoding='utf-8') as target:
+            self.assertEqual(json.loads(target.read()), {Fonts.name: path})
+
+    def test_text_is_rendered_once(self):
+        stats = StatHandler()
+        stats.score = 10
+        UIManager.game_view(stats)
+        UIManager.game_view(stats)
+        self.assertEqual(UIManager.text_misses, 2)
+        self.assertEqual(UIManager.text_hits, 2)
+
+        # only the changed score is rendered again
+        stats.score = 11
+        UIManager.game_view(stats)
+        self.assertEqual(UIManager.text_misses, 3)
+
+    def test_reinitializing_drops_text_of_the_old_fonts(self):
+        UIManager.get_text("a")
+        UIManager.initialize()
+        UIManager.get_text("a")
+        self.assertEqual(UIManager.text_misses, 1)
+        self.assertEqual(UIManager.text_hits, 0)
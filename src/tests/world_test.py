@@ -0,0 +1,63 @@
+import unittest
+from pygame.math import Vector2
+from utils.world import World
+from utils.game_state import State
+from utils.input_source import InputState, ScriptedInput
+from entities.platform import Platform
+from utils.settings import Settings
+from benchmarks.rollout import bot_input
+from tests.helpers import world_summary
+
+class TestWorld(unittest.TestCase):
+    def test_interleaved_worlds_match_separate_runs(self):
+        expected = []
+        for seed in (1, 2):
+            world = World(1200, 1000, bot_input(), Settings(seed=seed))
+            world.begin()
+            world.simulate(600)
+            expected.append(world_summary(world))
+
+        worlds = [World(1200, 1000, bot_input(), Settings(seed=seed)) for seed in (1, 2)]
+        for world in worlds:
+            world.begin()
+        for _ in range(600):
+            for world in worlds:
+                world.simulate(1)
+        self.assertEqual([world_summary(world) for world in worlds], expected)
+        self.assertNotEqual(expected[0], expected[1])
+
+    def test_gameover_only_ends_its_own_world(self):
+        falling = World(1200, 1000, ScriptedInput([InputState(right=True)], loop=True), Settings(seed=1))
+        idle = World(1200, 1000, settings=Settings(seed=1))
+        falling.begin()
+        idle.begin()
+        while (falling.simulate(1) == 1):
+            idle.simulate(1)
+        self.assertEqual(falling.state, State.ENDED)
+        self.assertEqual(idle.state, State.RUNNING)
+        deaths = [w.stats.fall_count + w.stats.squish_count for w in (falling, idle)]
+        self.assertEqual(deaths, [1, 0])
+
+    def test_platforms_are_drawn_in_spawn_order(self):
+        world = World(1200, 1000, bot_input(), Settings(seed=1))
+        world.begin()
+        world.simulate(600)
+        drawn = []
+        draw = Platform.draw
+        Platform.draw = lambda platform, alpha=1: drawn.append(platform.spawn_id)
+        try:
+            world.platforms.draw()
+        finally:
+            Platform.draw = draw
+        self.assertGreater(len(drawn), 1)
+        self.assertEqual(drawn, sorted(drawn))
+
+    def test_camera_follows_at_low_physics_rates(self):
+        world = World(1200, 1000, settings=Settings(physics_rate=5, seed=1))
+        world.begin()
+        # the player is high above the boundary
+        world.player.translate(Vector2(0, -600))
+        world.camera.update()
+        gap = world.player.coll.bounds.bottom - world.camera.top() - world.camera.boundary
+        self.assertLess(world.offset.y, 0)
+        self.assertLessEqual(abs(gap), 1)
@@ -0,0 +1,125 @@
+import os
+import struct
+from array import array
+from bisect import bisect_right
+from utils.input_source import InputSource, InputState
+from utils.data.world_state import WorldState
+
+# A recorded run: the level seed, one input bitmask per frame & periodic world state keyframes
+
+class Replay:
+    """
+    Binary layout (little-endian):\n
+    header: magic, format version, seed, physics time step, frame count, keyframe count\n
+    inputs: 1 byte per frame (see InputState.to_mask)\n
+    keyframes: frame index, byte length & WorldState bytes each
+    """
+    __MAGIC = b'PBPR'
+    # version 2: keyframes hold the start time of the run
+    __VERSION = 2
+    __HEADER = '<4sHIdII'
+    __KEYFRAME = '<II'
+
+    def __init__(self, seed: int, dt: float, inputs: array = None, keyframes: list[tuple] = None):
+        if (not Replay.is_valid_seed(seed)):
+            raise ValueError(f"replay seeds must fit in 32 bits: {seed}")
+        self.seed = seed
+        # the exact physics time step, so playback steps identically
+        self.dt = dt
+        self.inputs = array('B') if inputs is None else inputs
+        # (frame, world state) pairs in increasing frame order
+        self.keyframes = [] if keyframes is None else keyframes
+
+    # The header stores the seed as an unsigned 32-bit int
+    @classmethod
+    def is_valid_seed(cls, seed: int) -> bool:
+        return isinstance(seed, int) and 0 <= seed < 2**32
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.inputs)
+
+    def to_bytes(self) -> bytes:
+        parts = [struct.pack(self.__HEADER, self.__MAGIC, self.__VERSION, self.seed, self.dt,
+                             len(self.inputs), len(self.keyframes)), self.inputs.tobytes()]
+        for frame, state in self.keyframes:
+            parts.append(struct.pack(self.__KEYFRAME, frame, len(state)))
+            parts.append(state)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Replay':
+        magic, version, seed, dt, frame_count, keyframe_count = struct.unpack_from(cls.__HEADER, data)
+        if (magic != cls.__MAGIC or version != cls.__VERSION):
+            raise ValueError("not a replay file or an unsupported version")
+        offset = struct.calcsize(cls.__HEADER)
+        inputs = array('B', data[offset:offset + frame_count])
+        offset += frame_count
+        keyframes = []
+        for _ in range(keyframe_count):
+            frame, length = struct.unpack_from(cls.__KEYFRAME, data, offset)
+            offset += struct.calcsize(cls.__KEYFRAME)
+            keyframes.append((frame, data[offset:offset + length]))
+            offset += length
+        return Replay(seed, dt, inputs, keyframes)
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if (directory != '' and not os.path.exists(directory)):
+            os.makedirs(directory)
+        with open(path, 'wb') as target:
+            target.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        with open(path, 'rb') as target:
+            return cls.from_bytes(target.read())
+
+    # The last keyframe at or before the given frame (None if there is none)
+    def keyframe_before(self, frame: int) -> tuple:
+        i = bisect_right([k[0] for k in self.keyframes], frame)
+        return self.keyframes[i - 1] if i > 0 else None
+
+# Records the input of another source while passing it through
+
+class ReplayRecorder(InputSource):
+    def __init__(self, source: InputSource, world, keyframe_interval: int = 600):
+        """
+        source = the input source being recorded\n
+        world = the World the recorded input drives\n
+        keyframe_interval = frames between world state keyframes
+        """
+        super().__init__()
+        self.source = source
+        self.world = world
+        self.keyframe_interval = keyframe_interval
+        self.inputs = array('B')
+        self.keyframes = []
+
+    # Called right before each physics step, so the keyframe holds the state the step starts from
+    def update(self):
+        frame = len(self.inputs)
+        if (frame % self.keyframe_interval == 0):
+            self.keyframes.append((frame, WorldState.capture(self.world)))
+        self.source.update()
+        self.state = self.source.state
+        self.inputs.append(self.state.to_mask())
+
+    def to_replay(self) -> Replay:
+        return Replay(self.world.platforms.seed, self.world.time.dt, array('B', self.inputs), list(self.keyframes))
+
+# Feeds recorded input back to the player
+
+class ReplayInput(InputSource):
+    def __init__(self, replay: Replay, frame: int = 0):
+        super().__init__()
+        self.replay = replay
+        self.frame = frame
+
+    # Stays idle once the recording runs out
+    def update(self):
+        if (self.frame >= self.replay.frame_count):
+            self.state = InputState()
+            return
+        self.state = InputState.from_mask(self.replay.inputs[self.frame])
+        self.frame += 1
@@ -0,0 +1,143 @@
+import math
+
+# Mean & variance of a stream of values, updated in O(1) (Welford's algorithm)
+
+class RunningStats:
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count: int = 0, mean: float = 0, m2: float = 0):
+        self.count = count
+        self.mean = mean
+        # sum of squared differences from the mean
+        self.m2 = m2
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    # population variance
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count > 0 else 0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_list(self) -> list:
+        return [self.count, self.mean, self.m2]
+
+# Quantiles of a stream of non-negative values within a relative error
+# Values are counted in logarithmically sized buckets (like DDSketch), so the size only depends on their range
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 1024):
+        """
+        relative_accuracy = quantiles are within this fraction of a true value\n
+        max_buckets = the lowest buckets are merged beyond this (only the low quantiles lose accuracy)
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.__gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma = math.log(self.__gamma)
+        self.count = 0
+        # values <= 0
+        self.zero_count = 0
+        # bucket i counts the values in (gamma^(i-1), gamma^i]
+        self.buckets: dict[int, int] = {}
+
+    def add(self, x: float):
+        self.count += 1
+        if (x <= 0):
+            self.zero_count += 1
+            return
+        i = math.ceil(math.log(x) / self.__log_gamma)
+        self.buckets[i] = self.buckets.get(i, 0) + 1
+        if (len(self.buckets) > self.max_buckets):
+            lowest = min(self.buckets)
+            merged = self.buckets.pop(lowest)
+            second = min(self.buckets)
+            self.buckets[second] += merged
+
+    # q = [0, 1]
+    def quantile(self, q: float) -> float:
+        if (self.count == 0):
+            return 0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if (rank < seen):
+            return 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if (rank < seen):
+                return 2 * self.__gamma**i / (self.__gamma + 1)
+        return 2 * self.__gamma**max(self.buckets) / (self.__gamma + 1)
+
+    # Fraction of the values below x
+    def rank(self, x: float) -> float:
+        if (self.count == 0):
+            return 0
+        if (x <= 0):
+            return 0
+        index = math.ceil(math.log(x) / self.__log_gamma)
+        below = self.zero_count + sum(n for i, n in self.buckets.items() if i < index)
+        return below / self.count
+
+    def to_dict(self) -> dict:
+        return {'accuracy': self.relative_accuracy, 'zero': self.zero_count,
+                'buckets': [[i, n] for i, n in sorted(self.buckets.items())]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'QuantileSketch':
+        sketch = QuantileSketch(data['accuracy'])
+        sketch.zero_count = data['zero']
+        sketch.buckets = dict(data['buckets'])
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        return sketch
+
+# Statistics over every recorded run, updated in O(1) per run & saved in a compact form
+
+class RunHistory:
+    """Score mean, variance & quantiles and a histogram of the heights (in score units) players die at."""
+    # width of the height bands
+    band_size = 10
+
+    def __init__(self):
+        self.scores = RunningStats()
+        self.sketch = QuantileSketch()
+        # band (lowest height of it) -> deaths
+        self.death_bands: dict[int, int] = {}
+        self.__summary: dict = None
+
+    def add(self, score: int, height: int):
+        self.scores.add(score)
+        self.sketch.add(score)
+        band = height // self.band_size * self.band_size
+        self.death_bands[band] = self.death_bands.get(band, 0) + 1
+        self.__summary = None
+
+    # Values shown on the gameover screen (cached until the next run is added)
+    def summary(self) -> dict:
+        if (self.__summary is None):
+            deadliest = max(self.death_bands, key=self.death_bands.get) if len(self.death_bands) > 0 else 0
+            self.__summary = {'runs': self.scores.count, 'mean': self.scores.mean, 'std': self.scores.std,
+                              'p50': self.sketch.quantile(0.5), 'p90': self.sketch.quantile(0.9),
+                              'deadliest_band': deadliest}
+        return self.__summary
+
+    def to_dict(self) -> dict:
+        return {'scores': self.scores.to_list(), 'sketch': self.sketch.to_dict(),
+                'bands': [[band, n] for band, n in sorted(self.death_bands.items())]}
+
+    # data = None for an empty history
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RunHistory':
+        history = RunHistory()
+        if (data is None):
+            return history
+        history.scores = RunningStats(*data['scores'])
+        history.sketch = QuantileSketch.from_dict(data['sketch'])
+        history.death_bands = dict(data['bands'])
+        return history
@@ -1,50 +1,192 @@
 import json
 import os
+import threading
+from contextlib import contextmanager
+from utils.data.run_history import RunHistory
+
+# file locks: fcntl on POSIX, msvcrt on Windows (the missing one is None)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
 
 # Save data, which must persist over sessions
 
 class SaveManager:
-    """Read / Write data from / to file."""
-    __path = "src/assets/current_save.json"
+    """
+    Finished runs are appended to a journal (one JSON line each, fsync'd), so saving never rewrites
+    existing data & sessions saving at the same time add up instead of overwriting each other.\n
+    The journal is folded into the snapshot (current_save.json) by compaction: the new snapshot is written
+    to a temporary file & swapped in with os.replace, naming the next journal generation, so a crash
+    at any point leaves either the old or the new snapshot with its own journal.\n
+    Sessions take a lock file around every load, append & compaction. Appends read the snapshot's
+    generation under the lock, so a session never appends to a journal another session has compacted.
+    """
+    directory = "src/assets"
+    # the journal is compacted on load once it holds this many runs
+    compaction_threshold = 256
+
+    __snapshot = "current_save.json"
+    __lock_file = "save.lock"
+    # file locks are per process: threads of the same session wait on this first
+    __thread_lock = threading.Lock()
     __allowed_keys = ["highscore", "fall_count", "squish_count"]
+    __run_keys = ["score", "death", "duration", "seed"]
+    # where the run ended (in score units)
+    __optional_run_keys = ["height"]
+    __deaths = ["fall", "squish"]
 
     # READ
+    # Totals of the snapshot & the journal ('highscore', 'fall_count', 'squish_count', 'runs' &
+    # 'history', see RunHistory.to_dict), None if nothing has been saved yet
+    @classmethod
+    def load(cls) -> dict:
+        with cls.__locked():
+            snapshot = cls.__read_snapshot()
+            totals, records = cls.__read_journal(snapshot)
+            if (records >= cls.compaction_threshold):
+                cls.__write_snapshot(totals)
+            if (records == 0 and not os.path.exists(cls.__path(cls.__snapshot))):
+                return None
+        return {k: totals[k] for k in cls.__allowed_keys + ['runs', 'history']}
+
+    # WRITE
+    # run = {'score': int, 'death': 'fall' / 'squish', 'duration': seconds, 'seed': int, 'height': int (optional)}
+    @classmethod
+    def append_run(cls, run: dict):
+        cls.append_runs([run])
+
+    # All runs are appended with a single write & fsync
+    @classmethod
+    def append_runs(cls, runs: list[dict]):
+        for run in runs:
+            if (not cls.is_valid_run(run)):
+                raise ValueError("run fields were incorrect")
+        data = ''.join(json.dumps(run) + '\n' for run in runs).encode('utf-8')
+        with cls.__locked():
+            # another session may have compacted since this one loaded
+            generation = cls.__read_snapshot()['generation']
+            fd = os.open(cls.__journal(generation), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    # Fold the journal into a new snapshot & start the next journal
+    @classmethod
+    def compact(cls):
+        with cls.__locked():
+            totals, _ = cls.__read_journal(cls.__read_snapshot())
+            cls.__write_snapshot(totals)
+
+    # Held by one session (& one thread of it) at a time
+    @classmethod
+    @contextmanager
+    def __locked(cls):
+        if (not os.path.exists(cls.directory)):
+            os.makedirs(cls.directory)
+        with cls.__thread_lock:
+            fd = os.open(cls.__path(cls.__lock_file), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if (fcntl is not None):
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                yield
+            finally:
+                # closing the file releases the lock
+                os.close(fd)
+
     @classmethod
-    def decode(cls) -> dict:
-        if (not os.path.exists(cls.__path)):
-            return None
-        data = None
-        with open(cls.__path, 'r', encoding='utf-8') as target:
+    def __read_snapshot(cls) -> dict:
+        path = cls.__path(cls.__snapshot)
+        if (not os.path.exists(path)):
+            return {'highscore': 0, 'fall_count': 0, 'squish_count': 0, 'runs': 0, 'history': None, 'generation': 0}
+        with open(path, 'r', encoding='utf-8') as target:
             data = json.loads(target.read())
-        if (not cls.__is_valid(data)):
+        # snapshots from before the journal only have the stats
+        data.setdefault('runs', 0)
+        data.setdefault('history', None)
+        data.setdefault('generation', 0)
+        if (not cls.__is_valid({k: data[k] for k in data if k in cls.__allowed_keys})):
             raise ValueError("data fields were incorrect")
         return data
 
-    # WRITE
+    # Adds the journal of the snapshot's generation to its totals in a single pass
+    # Returns (totals, number of runs in the journal)
     @classmethod
-    def encode(cls, data: dict):
-        if (not cls.__is_valid(data)):
-            raise ValueError("data fields were incorrect")
+    def __read_journal(cls, snapshot: dict) -> tuple:
+        totals = dict(snapshot)
+        path = cls.__journal(snapshot['generation'])
+        if (not os.path.exists(path)):
+            return totals, 0
+        history = RunHistory.from_dict(snapshot['history'])
 
-        updated = None
-        if (os.path.exists(cls.__path)):
-            with open(cls.__path, 'r', encoding='utf-8') as target:
-                old = json.loads(target.read())
-            updated = cls.__copy_data(data, old)
-        else:
-            if (not os.path.exists('src/assets')):
-                os.mkdir('src/assets')
-            updated = data
+        records = 0
+        complete = 0
+        with open(path, 'rb') as target:
+            for line in target:
+                # a crash during an append can leave a partial last line
+                if (not line.endswith(b'\n')):
+                    break
+                complete += len(line)
+                run = json.loads(line)
+                if (not cls.is_valid_run(run)):
+                    raise ValueError("run fields were incorrect")
+                totals['highscore'] = max(totals['highscore'], run['score'])
+                totals[run['death'] + '_count'] += 1
+                totals['runs'] += 1
+                history.add(run['score'], run.get('height', 0))
+                records += 1
+        totals['history'] = history.to_dict()
+        # drop the partial line, so the next record starts on a line of its own
+        if (complete < os.path.getsize(path)):
+            os.truncate(path, complete)
+        return totals, records
+
+    @classmethod
+    def __write_snapshot(cls, totals: dict):
+        generation = totals['generation'] + 1
+        data = {k: totals[k] for k in cls.__allowed_keys + ['runs', 'history']}
+        data['generation'] = generation
+        path = cls.__path(cls.__snapshot)
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as target:
+            target.write(json.dumps(data))
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(temporary, path)
+        cls.__sync_directory()
+        # older journals are already part of the new snapshot (earlier ones are left behind by a crash)
+        for name in os.listdir(cls.directory):
+            parts = name.split('.')
+            if (len(parts) == 3 and parts[0] == 'runs' and parts[2] == 'journal'
+                    and parts[1].isdigit() and int(parts[1]) < generation):
+                os.remove(cls.__path(name))
 
-        with open(cls.__path, 'w', encoding='utf-8') as target:
-            target.write(json.dumps(updated))
-    
+    # Make the replaced snapshot durable (not supported on all platforms)
     @classmethod
-    def __copy_data(cls, new_data: dict, old_data: dict) -> dict:
-        for k in cls.__allowed_keys:
-            if (old_data[k] < new_data[k]):
-                old_data[k] = new_data[k]
-        return old_data
+    def __sync_directory(cls):
+        if (not hasattr(os, 'O_DIRECTORY')):
+            return
+        fd = os.open(cls.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def __path(cls, name: str) -> str:
+        return os.path.join(cls.directory, name)
+
+    @classmethod
+    def __journal(cls, generation: int) -> str:
+        return cls.__path(f"runs.{generation}.journal")
 
     @classmethod
     def __is_valid(cls, data: dict) -> bool:
@@ -58,3 +200,13 @@ class SaveManager:
         if (count != len(cls.__allowed_keys)):
             return False
         return True
+
+    @classmethod
+    def is_valid_run(cls, run: dict) -> bool:
+        if (not isinstance(run, dict) or any(k not in run for k in cls.__run_keys)):
+            return False
+        if (any(k not in cls.__run_keys + cls.__optional_run_keys for k in run)):
+            return False
+        if (run['death'] not in cls.__deaths or not isinstance(run.get('height', 0), int)):
+            return False
+        return str.isdigit(str(run['score'])) and str.isdigit(str(run['seed'])) and run['duration'] >= 0
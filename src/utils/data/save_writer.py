@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from utils.data.save_data import SaveManager
+
+# Writes save data on a background thread, so the game never waits for the disk
+
+class SaveWriter:
+    """
+    Runs are queued & appended to the journal by a daemon thread. Runs queued while a write is in progress
+    are coalesced into the next write (a single append & fsync).\n
+    The queue is bounded: when it's full, submit waits up to stall_timeout seconds for the writer
+    (counted as a stall) & then drops the run (counted as dropped), so a failing disk never freezes the game.
+    Failed writes are kept (as far as the bound allows) & retried after retry_delay seconds.
+    """
+    max_queue = 64
+    stall_timeout = 0.5
+    retry_delay = 1.0
+    # how long quitting waits for the queued runs to be written (in seconds)
+    exit_timeout = 10
+
+    __pending: deque[dict] = deque()
+    # runs taken by the writer, which haven't been written yet
+    __in_flight = 0
+    __condition = threading.Condition()
+    __thread: threading.Thread = None
+
+    # writes & runs written, submits which had to wait for space, failed writes & runs dropped
+    writes = 0
+    records = 0
+    stalls = 0
+    errors = 0
+    dropped = 0
+    max_depth = 0
+    # duration of the writes in milliseconds
+    last_latency = 0
+    max_latency = 0
+    __total_latency = 0
+
+    # run = see SaveManager.append_run
+    # Returns False if the run was dropped, because the queue stayed full
+    @classmethod
+    def submit(cls, run: dict) -> bool:
+        if (not SaveManager.is_valid_run(run)):
+            raise ValueError("run fields were incorrect")
+        with cls.__condition:
+            if (cls.queue_depth() >= cls.max_queue):
+                cls.stalls += 1
+                if (not cls.__condition.wait_for(lambda: cls.queue_depth() < cls.max_queue, cls.stall_timeout)):
+                    cls.dropped += 1
+                    return False
+            cls.__pending.append(run)
+            cls.max_depth = max(cls.max_depth, cls.queue_depth())
+            cls.__condition.notify_all()
+            if (cls.__thread is None):
+                cls.__thread = threading.Thread(target=cls.__run, name="SaveWriter", daemon=True)
+                cls.__thread.start()
+        return True
+
+    # Wait until everything submitted has been written
+    # Returns False if that didn't happen within timeout seconds
+    @classmethod
+    def flush(cls, timeout: float = None) -> bool:
+        with cls.__condition:
+            return cls.__condition.wait_for(lambda: cls.queue_depth() == 0, timeout)
+
+    # Runs waiting to be written (including the ones being written)
+    @classmethod
+    def queue_depth(cls) -> int:
+        return len(cls.__pending) + cls.__in_flight
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {'queue_depth': cls.queue_depth(), 'max_depth': cls.max_depth, 'writes': cls.writes,
+                'records': cls.records, 'stalls': cls.stalls, 'errors': cls.errors, 'dropped': cls.dropped,
+                'last_latency': cls.last_latency, 'max_latency': cls.max_latency,
+                'mean_latency': cls.__total_latency / cls.writes if cls.writes > 0 else 0}
+
+    @classmethod
+    def clear_stats(cls):
+        with cls.__condition:
+            cls.writes = 0
+            cls.records = 0
+            cls.stalls = 0
+            cls.errors = 0
+            cls.dropped = 0
+            cls.max_depth = cls.queue_depth()
+            cls.last_latency = 0
+            cls.max_latency = 0
+            cls.__total_latency = 0
+
+    @classmethod
+    def __run(cls):
+        while (True):
+            with cls.__condition:
+                cls.__condition.wait_for(lambda: len(cls.__pending) > 0)
+                batch = list(cls.__pending)
+                cls.__pending.clear()
+                cls.__in_flight = len(batch)
+                cls.__condition.notify_all()
+
+            start = time.perf_counter()
+            try:
+                SaveManager.append_runs(batch)
+            # any failure (ie. a full disk, or a KeyError from a corrupt snapshot) must not stop the writer thread
+            except Exception:  # pylint: disable=broad-exception-caught
+                with cls.__condition:
+                    cls.errors += 1
+                    cls.__pending.extendleft(reversed(batch))
+                    cls.__in_flight = 0
+                    # runs submitted during the write took the space: the oldest ones don't fit anymore
+                    while (len(cls.__pending) > cls.max_queue):
+                        cls.__pending.popleft()
+                        cls.dropped += 1
+                    cls.__condition.notify_all()
+                time.sleep(cls.retry_delay)
+                continue
+
+            ms = (time.perf_counter() - start) * 1000
+            with cls.__condition:
+                cls.writes += 1
+                cls.records += len(batch)
+                cls.last_latency = ms
+                cls.max_latency = max(cls.max_latency, ms)
+                cls.__total_latency += ms
+                cls.__in_flight = 0
+                cls.__condition.notify_all()
@@ -1,7 +1,7 @@
 import random
 from enum import Enum
-from utils.gui.stage import Stage
-from utils.data.save_data import SaveManager
+from utils.data.save_writer import SaveWriter
+from utils.data.run_history import RunHistory
 
 # How the game ended
 class DeathType(Enum):
@@ -10,83 +10,90 @@ class DeathType(Enum):
 
 # Handles data
 class StatHandler:
-    """Handles player session variables."""
-    score = 0
-    highscore = 0
+    """Handles player session variables (of a single world)."""
+    def __init__(self):
+        self.score = 0
+        self.highscore = 0
 
-    fall_count = 0
-    squish_count = 0
+        self.fall_count = 0
+        self.squish_count = 0
 
-    death_msg = ""
+        self.death_msg = ""
+        # how the current run ended (None while it's running)
+        self.death_type: DeathType = None
+        # current height of the player (in score units)
+        self.height = 0
+        # statistics of all recorded runs
+        self.history = RunHistory()
 
-    @classmethod
-    def update_score(cls, player_height: int):
-        cls.score = max(
-            cls.score,
-            (Stage.HEIGHT / 2 - player_height) // 50
+    # screen_height = height of the world's view, the score is counted from its middle
+    def update_score(self, player_height: int, screen_height: int):
+        self.height = int((screen_height / 2 - player_height) // 50)
+        self.score = max(
+            self.score,
+            self.height
         )
 
-    @classmethod
-    def is_highscore(cls) -> bool:
-        return cls.score > cls.highscore
+    def is_highscore(self) -> bool:
+        return self.score > self.highscore
     
     # Update stats after a death occured
     # Set a randomized death message based on the type of death
-    @classmethod
-    def initiate_death(cls, death_type: DeathType):
+    def initiate_death(self, death_type: DeathType):
+        self.death_type = death_type
+        self.history.add(int(self.score), self.height)
         if (death_type == DeathType.FALL):
-            cls.fall_count += 1
+            self.fall_count += 1
         elif (death_type == DeathType.SQUISH):
-            cls.squish_count += 1
+            self.squish_count += 1
         
-        if (cls.is_highscore()):
-            cls.death_msg = DeathMessages.highscore_msg
-            cls.highscore = cls.score
+        if (self.is_highscore()):
+            self.death_msg = DeathMessages.highscore_msg
+            self.highscore = self.score
         elif (death_type == DeathType.FALL):
-            cls.death_msg = DeathMessages.get_fall_msg()
+            self.death_msg = DeathMessages.get_fall_msg(self)
         elif (death_type == DeathType.SQUISH):
-            cls.death_msg = DeathMessages.get_squish_msg()
+            self.death_msg = DeathMessages.get_squish_msg(self)
 
-    # Save data to file
-    @classmethod
-    def save(cls):
-        cls.score = 0
-        data = {
-            'highscore': int(cls.highscore),
-            'fall_count': cls.fall_count,
-            'squish_count': cls.squish_count
-        }
-        SaveManager.encode(data)
+    # Record the finished run (None if the run didn't end) & start counting a new one
+    # run = score, death type, duration & seed (see SaveManager.append_run), written in the background
+    def save(self, run: dict):
+        self.score = 0
+        self.death_type = None
+        if (run is not None):
+            SaveWriter.submit(run)
 
     # Load data from a file, if it exists
-    @classmethod
-    def initialize(cls, data: dict):
+    def initialize(self, data: dict):
         if (data is None):
             return
-        cls.highscore = int(data['highscore'])
-        cls.fall_count = data['fall_count']
-        cls.squish_count = data['squish_count']
+        self.highscore = int(data['highscore'])
+        self.fall_count = data['fall_count']
+        self.squish_count = data['squish_count']
+        self.history = RunHistory.from_dict(data['history'])
 
 # Manages death messages
 class DeathMessages:
+    # separate from the level generation's random stream
+    __rng = random.Random()
 
     @classmethod
-    def get_fall_msg(cls) -> str:
-        if (random.random() < 1 / 3):
-            return f"you have fallen {StatHandler.fall_count} time{'s' if StatHandler.fall_count != 1 else ''}"
+    def get_fall_msg(cls, stats: StatHandler) -> str:
+        if (cls.__rng.random() < 1 / 3):
+            return f"you have fallen {stats.fall_count} time{'s' if stats.fall_count != 1 else ''}"
         
-        msg = random.choice(cls.__fall_msgs)
-        while (msg == StatHandler.death_msg):
-            msg = random.choice(cls.__fall_msgs)
+        msg = cls.__rng.choice(cls.__fall_msgs)
+        while (msg == stats.death_msg):
+            msg = cls.__rng.choice(cls.__fall_msgs)
         return msg
     
     @classmethod
-    def get_squish_msg(cls) -> str:
-        if (random.random() < 1 / 3):
-            return f"current scoreboard is 0 - {StatHandler.squish_count}, in favor of the platforms"
-        msg = random.choice(cls.__squish_msgs)
-        while (msg == StatHandler.death_msg):
-            msg = random.choice(cls.__squish_msgs)
+    def get_squish_msg(cls, stats: StatHandler) -> str:
+        if (cls.__rng.random() < 1 / 3):
+            return f"current scoreboard is 0 - {stats.squish_count}, in favor of the platforms"
+        msg = cls.__rng.choice(cls.__squish_msgs)
+        while (msg == stats.death_msg):
+            msg = cls.__rng.choice(cls.__squish_msgs)
         return msg
 
     __fall_msgs = [
@@ -1,14 +1,48 @@
-from pygame.time import Clock, get_ticks
+from pygame.time import Clock
 
 # Keeps time
 
 class Time:
-    # 'deltatime' or the time in between frames
-    dt = 0
-    # Total time since the game began
-    time = 0
+    """The clock of a single world (every World has its own)."""
+    # Longer frames are slowed down instead of simulated fully (avoids a spiral of death)
+    max_frame_time = 0.25
+
+    def __init__(self, physics_rate: float = 60):
+        # 'deltatime' or the fixed time step of a single physics update
+        self.dt = self.__step_of(physics_rate)
+        # Total game time since the game began
+        self.time = 0
+        # How far the rendered frame is between the previous and the current physics state [0, 1]
+        self.alpha = 1
+        self.__accumulator = 0
+
+    # rate = physics updates per second
+    def set_physics_rate(self, rate: float):
+        self.dt = self.__step_of(rate)
 
     @classmethod
-    def update(cls, clock: Clock):
-        cls.dt = clock.get_time() / 1000
-        cls.time += get_ticks() / 1000
+    def __step_of(cls, rate: float) -> float:
+        if (not isinstance(rate, (int, float)) or not 0 < rate < float('inf')):
+            raise ValueError(f"physics rate must be a positive number: {rate}")
+        return 1 / rate
+
+    # Accumulate the real time elapsed during the previous frame
+    def update(self, clock: Clock):
+        self.__accumulator += min(clock.get_time() / 1000, self.max_frame_time)
+
+    # Consume a physics step worth of accumulated time, if there is enough of it
+    def next_step(self) -> bool:
+        if (self.__accumulator < self.dt):
+            self.alpha = self.__accumulator / self.dt
+            return False
+        self.__accumulator -= self.dt
+        return True
+
+    # Advance game time by a single physics step
+    def step(self):
+        self.time += self.dt
+
+    def reset(self):
+        self.time = 0
+        self.alpha = 1
+        self.__accumulator = 0
@@ -0,0 +1,153 @@
+import struct
+from pygame.math import Vector2
+from physics.colliders import CircleCollider, PolygonCollider
+from physics.collisionhandler import CollisionInfo
+from entities.player import Player
+from entities.platform import Platform
+from utils.game_state import State
+from utils.environment.platform_manager import PlatformManager
+
+# Packs values into a little-endian byte buffer
+
+class _Writer:
+    def __init__(self):
+        self.parts = []
+
+    def write(self, fmt: str, *values):
+        self.parts.append(struct.pack('<' + fmt, *values))
+
+    def vector(self, v: Vector2):
+        self.write('2d', v.x, v.y)
+
+    def to_bytes(self) -> bytes:
+        return b''.join(self.parts)
+
+# Reads values packed by _Writer
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def read(self, fmt: str) -> tuple:
+        values = struct.unpack_from('<' + fmt, self.data, self.offset)
+        self.offset += struct.calcsize('<' + fmt)
+        return values
+
+    def vector(self) -> Vector2:
+        return Vector2(self.read('2d'))
+
+# A snapshot of everything the simulation depends on
+
+class WorldState:
+    """Captures & restores the state of a running game as bytes (used for replay keyframes)."""
+    __CIRCLE = 0
+    __POLYGON = 1
+
+    # world = the World being captured
+    @classmethod
+    def capture(cls, world) -> bytes:
+        w = _Writer()
+        platforms = world.platforms
+        w.write('7dIIB', world.time.time, world.run_start, world.offset.x, world.offset.y, world.stats.score,
+                platforms.spawn_timer, platforms.next_static_bottom,
+                platforms.static_dist, platforms.seed, list(State).index(world.game_state.state))
+        cls.__capture_rng(w, platforms)
+        cls.__capture_player(w, world.player)
+        w.write('2I', len(platforms.current_platforms), platforms.spawn_count)
+        for p in platforms.current_platforms:
+            cls.__capture_platform(w, p)
+        return w.to_bytes()
+
+    # Restore a captured state into a running world
+    @classmethod
+    def restore(cls, data: bytes, world):
+        r = _Reader(data)
+        platforms = world.platforms
+        (world.time.time, world.run_start, x, y, world.stats.score, platforms.spawn_timer,
+         platforms.next_static_bottom, platforms.static_dist, platforms.seed, state) = r.read('7dIIB')
+        world.offset.update(x, y)
+        world.prev_offset.update(x, y)
+        world.game_state.state = list(State)[state]
+        cls.__restore_rng(r, platforms)
+        cls.__restore_player(r, world.player)
+        count, spawn_count = r.read('2I')
+        platforms.load_platforms([cls.__restore_platform(r) for _ in range(count)], spawn_count)
+
+    @classmethod
+    def __capture_rng(cls, w: _Writer, platforms: PlatformManager):
+        version, internal, gauss_next = platforms.rng.getstate()
+        w.write('iI', version, len(internal))
+        w.write(f'{len(internal)}I', *internal)
+        w.write('?d', gauss_next is not None, 0 if gauss_next is None else gauss_next)
+
+    @classmethod
+    def __restore_rng(cls, r: _Reader, platforms: PlatformManager):
+        version, n = r.read('iI')
+        internal = r.read(f'{n}I')
+        has_gauss, gauss_next = r.read('?d')
+        platforms.rng.setstate((version, internal, gauss_next if has_gauss else None))
+
+    @classmethod
+    def __capture_player(cls, w: _Writer, player: Player):
+        w.vector(player.coll.pos)
+        w.vector(player.up)
+        w.vector(player.right)
+        vel, surface_vel, direction, jump_pressed, grounded, can_jump, point, buffer = player.controller.get_state()
+        w.vector(vel)
+        w.vector(surface_vel)
+        w.write('b???', direction, jump_pressed, grounded, can_jump)
+        w.write('?', point is not None)
+        if (point is not None):
+            w.vector(point)
+        w.write('I', len(buffer))
+        for info in buffer:
+            w.vector(info.normal)
+            w.write('d', info.overlap)
+            w.vector(info.point)
+            w.vector(info.inherited_offset)
+
+    @classmethod
+    def __restore_player(cls, r: _Reader, player: Player):
+        player.coll.pos = r.vector()
+        player.up = r.vector()
+        player.right = r.vector()
+        player.store_position()
+        vel = r.vector()
+        surface_vel = r.vector()
+        direction, jump_pressed, grounded, can_jump = r.read('b???')
+        point = r.vector() if r.read('?')[0] else None
+        buffer = []
+        for _ in range(r.read('I')[0]):
+            normal = r.vector()
+            info = CollisionInfo(normal, r.read('d')[0], r.vector())
+            info.inherited_offset = r.vector()
+            buffer.append(info)
+        player.controller.set_state((vel, surface_vel, direction, jump_pressed, grounded, can_jump, point, buffer))
+
+    @classmethod
+    def __capture_platform(cls, w: _Writer, p: Platform):
+        w.write('?3BI', p.is_static, *p.color, p.spawn_id)
+        w.vector(p.coll.pos)
+        w.vector(p.vel)
+        if (isinstance(p.coll, CircleCollider)):
+            w.write('Bd', cls.__CIRCLE, p.coll.radius)
+            return
+        w.write('BB', cls.__POLYGON, p.coll.degree)
+        for v in p.coll.local_vertices:
+            w.vector(v)
+
+    @classmethod
+    def __restore_platform(cls, r: _Reader) -> Platform:
+        is_static, red, green, blue, spawn_id = r.read('?3BI')
+        pos = r.vector()
+        vel = r.vector()
+        kind = r.read('B')[0]
+        if (kind == cls.__CIRCLE):
+            coll = CircleCollider(pos, r.read('d')[0])
+        else:
+            coll = PolygonCollider(pos, [r.vector() for _ in range(r.read('B')[0])])
+        platform = Platform(is_static, coll, (red, green, blue))
+        platform.vel = vel
+        platform.spawn_id = spawn_id
+        return platform
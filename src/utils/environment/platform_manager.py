@@ -1,181 +1,382 @@
+import heapq
 import math
 import random
+from collections import deque
 from pygame.math import Vector2
-from utils.data.time import Time
-from utils.gui.camera import Camera
+from pygame.rect import Rect
 from physics.colliders import CircleCollider, PolygonCollider
-from physics.collisionhandler import CollisionHandler
-from entities.player import Player
+from physics.collisionhandler import CollisionHandler, CollisionInfo
+from physics.spatial_hash import SpatialHash
+from physics.shape_templates import ShapeTemplates
+from physics.batch_collision import BatchCollisionHandler
+from utils.environment.platform_store import PlatformStore
+from utils.optional import HAS_NUMPY
 from entities.platform import Platform
 
 # Generates and updates Platform objects
 
 class PlatformManager:
-    """Stores & updates platforms and controls their procedural generation."""
-    current_platforms: list[Platform] = []
+    """Stores & updates the platforms of a world and controls their procedural generation."""
+    # broad phase for collision, unloading & culling
+    cell_size = 200
+    # with NumPy, platform state lives in contiguous arrays and moves in a single vectorized step
+    # (only in crowded levels, since with a few platforms the NumPy overhead outweighs the gain)
+    store_threshold = 48
+    # With this many platforms near the player, they're tested in a single NumPy batch (None = never)
+    # Off by default: building a batch costs more than testing the few platforms the grid returns one by one
+    batch_threshold: int = None
 
     # Static Platform Variables
-    static_dist = 200
-    next_static_bottom = 0
+    # the distance between static platforms starts at start_static_dist & grows by static_dist_step per platform
+    start_static_dist = 200
+    static_dist_step = 100
 
     # Dynamic Platform Variables
     spawn_delay = 2.5
-    spawn_timer = 0
 
     start_platform_color = (0, 200, 100)
     static_platform_color = (200, 200, 50)
     dynamic_platform_color = (50, 200, 200)
 
+    def __init__(self, world):
+        """world = the World, whose camera, time & player the platforms are generated & collided with"""
+        self.world = world
+        # generation has its own random stream, so the same seed always produces the same level
+        self.rng = random.Random()
+        self.seed = 0
+
+        # ordered sets (dicts with None values) in spawn order, so platforms can be removed in O(1)
+        self.current_platforms: dict[Platform, None] = {}
+        self.dynamic_platforms: dict[Platform, None] = {}
+        self.spawn_count = 0
+        self.grid = SpatialHash(self.cell_size)
+        self.store = PlatformStore(self.cell_size) if HAS_NUMPY else None
+        self.__store_active = False
+
+        # Unloading indexes, so finding the platforms to unload does not depend on how many there are
+        # static platforms spawn higher & higher: the lowest one is always at the front
+        self.__static_order: deque[Platform] = deque()
+        # dynamic platforms only move sideways: (-top, spawn_id, platform) heap, the lowest one first
+        self.__dynamic_by_top: list[tuple] = []
+        # (time at which the platform leaves the side of the screen, spawn_id, platform) heap
+        # Entries of removed platforms are skipped lazily (spawn_id no longer matches or it's not alive)
+        self.__dynamic_expiry: list[tuple] = []
+
+        # Static Platform Variables
+        self.static_dist = self.start_static_dist
+        self.next_static_bottom = 0
+
+        self.spawn_timer = 0
+
 # Control Methods
 
     # Ran at the beginning of a game
-    @classmethod
-    def begin(cls):
-        start_platform_coll = CircleCollider(Vector2(Camera.horizontal_center(), Camera.bottom() - 150), 100)
-        start_platform = Platform(True, start_platform_coll, cls.start_platform_color)
-        cls.current_platforms.append(start_platform)
+    # seed = seed for the level generation (a random one is picked if None)
+    def begin(self, seed: int = None):
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.rng.seed(self.seed)
+        camera = self.world.camera
+        start_platform_coll = CircleCollider(Vector2(camera.horizontal_center(), camera.bottom() - 150), 100)
+        start_platform = Platform(True, start_platform_coll, self.start_platform_color)
+        self.__add(start_platform)
 
-        cls.next_static_bottom = start_platform_coll.bounds.top - cls.static_dist
+        self.next_static_bottom = start_platform_coll.bounds.top - self.static_dist
 
-    @classmethod
-    def update(cls):
-        cls.__generate()
-        cls.__unload()
-        cls.__update_platforms()
+    def update(self):
+        self.__generate()
+        self.__unload()
+        self.__update_platforms()
 
-    @classmethod
-    def reset(cls):
-        cls.static_dist = 200
-        cls.spawn_timer = 0
-        cls.current_platforms.clear()
+    # Store the positions of moving platforms before a physics step
+    def store_positions(self):
+        if (self.__store_active):
+            self.store.store_positions()
+            return
+        for c in self.dynamic_platforms:
+            c.store_position()
+
+    def reset(self):
+        self.static_dist = self.start_static_dist
+        self.spawn_timer = 0
+        self.spawn_count = 0
+        self.__clear_store()
+        for p in self.current_platforms:
+            Platform.release(p)
+        self.current_platforms.clear()
+        self.dynamic_platforms.clear()
+        self.grid.clear()
+        self.__clear_unload_indexes()
 
+    # Only platforms near the screen are drawn
+    # in spawn order, so overlapping platforms don't swap places as they move between grid cells
+    def draw(self, alpha: float = 1):
+        view = Rect(self.world.camera.left(), self.world.camera.top(), self.world.width, self.world.height)
+        for c in sorted(self.grid.query(view), key=lambda p: p.spawn_id):
+            c.draw(alpha)
+
+    # Hit rates etc. of the object pools, for tuning their sizes
     @classmethod
-    def draw(cls):
-        for c in cls.current_platforms:
-            c.draw()
+    def pool_stats(cls) -> dict:
+        return {
+            'platform': Platform.pool.stats(),
+            'circle_collider': CircleCollider.pool.stats(),
+            'polygon_collider': PolygonCollider.pool.stats(),
+            'collision_info': CollisionInfo.pool.stats()
+        }
+
+    # How far along motion [0, 1] the circle can move before hitting a platform (continuous collision)
+    def sweep_circle(self, circ: CircleCollider, motion: Vector2) -> float:
+        start = circ.bounds
+        area = start.union(start.move(round(motion.x), round(motion.y)))
+        toi = 1
+        for p in self.grid.query(area):
+            t = CollisionHandler.sweep_circle(circ, motion, p.coll)
+            if (t is not None and t < toi):
+                toi = t
+        return toi
+
+    # Platforms, which may overlap the given world space area
+    def query(self, area: Rect) -> list[Platform]:
+        return self.grid.query(area)
+
+    # Replace all platforms with already existing ones (ie. when restoring a saved state)
+    def load_platforms(self, platforms: list[Platform], spawn_count: int):
+        self.current_platforms.clear()
+        self.dynamic_platforms.clear()
+        self.grid.clear()
+        self.__clear_store()
+        self.__clear_unload_indexes()
+        for p in platforms:
+            self.__insert(p)
+        self.spawn_count = spawn_count
+
+    def __add(self, platform: Platform):
+        platform.spawn_id = self.spawn_count
+        self.spawn_count += 1
+        self.__insert(platform)
+
+    def __insert(self, platform: Platform):
+        self.current_platforms[platform] = None
+        if (platform.is_static):
+            self.__insert_static(platform)
+        else:
+            self.dynamic_platforms[platform] = None
+            heapq.heappush(self.__dynamic_by_top, (-platform.coll.bounds.top, platform.spawn_id, platform))
+            self.__schedule_expiry(platform)
+        self.grid.insert(platform, platform.coll.bounds)
+        if (self.__store_active):
+            platform.attach(self.store, self.store.add(platform, platform.vel))
+        self.__update_store_mode()
+
+    # Static platforms have to be removed from __static_order by the caller
+    def __remove(self, platform: Platform):
+        del self.current_platforms[platform]
+        if (not platform.is_static):
+            del self.dynamic_platforms[platform]
+        self.grid.remove(platform)
+        if (self.__store_active):
+            row = platform.row
+            platform.detach()
+            moved = self.store.remove(row)
+            if (moved is not None):
+                moved.attach(self.store, row)
+        self.__update_store_mode()
+
+    # Move the platforms into the store once there are enough of them & back out when most are gone
+    def __update_store_mode(self):
+        count = len(self.current_platforms)
+        if (not self.__store_active and self.store is not None and count >= self.store_threshold):
+            for p in self.current_platforms:
+                p.attach(self.store, self.store.add(p, p.vel))
+            self.__store_active = True
+        elif (self.__store_active and count < self.store_threshold // 2):
+            self.__clear_store()
+
+    def __clear_store(self):
+        if (not self.__store_active):
+            return
+        for p in self.store.platforms:
+            p.detach()
+        self.store.clear()
+        self.__store_active = False
 
 # Generation Methods
 
     # Is the player high enough for the next static platform to appear
-    @classmethod
-    def __spawn_next_static(cls) -> bool:
-        return Camera.top() < cls.next_static_bottom
+    def __spawn_next_static(self) -> bool:
+        return self.world.camera.top() < self.next_static_bottom
     
     # Is it time to spawn the next dynamic platform
-    @classmethod
-    def __spawn_next_dynamic(cls) -> bool:
-        return cls.spawn_timer > cls.spawn_delay
+    def __spawn_next_dynamic(self) -> bool:
+        return self.spawn_timer > self.spawn_delay
     
     # The distance between static platforms increases as the player gets higher
-    @classmethod
-    def __increase_difficulty(cls):
-        cls.static_dist += 100
+    def __increase_difficulty(self):
+        self.static_dist += self.static_dist_step
 
     # Generate platforms, if possible
-    @classmethod
-    def __generate(cls):
-        while (cls.__spawn_next_static()):
-            cls.__create_static()
-            cls.__increase_difficulty()
-
-        cls.spawn_timer += Time.dt
-        if (cls.__spawn_next_dynamic()):
-            cls.spawn_timer = 0
-            cls.__create_dynamic()
+    def __generate(self):
+        while (self.__spawn_next_static()):
+            self.__create_static()
+            self.__increase_difficulty()
+
+        self.spawn_timer += self.world.time.dt
+        if (self.__spawn_next_dynamic()):
+            self.spawn_timer = 0
+            self.__create_dynamic()
     
     # Create a static platform
-    @classmethod
-    def __create_static(cls):
-        size = random.randint(25, 150)
+    def __create_static(self):
+        size = self.rng.randint(25, 150)
 
-        if (random.random() < 0.5):
-            x = random.randint(size, Camera.right() - size)
-            y = cls.next_static_bottom - size
-            coll = CircleCollider(Vector2(x, y), size)
+        if (self.rng.random() < 0.5):
+            x = self.rng.randint(size, self.world.camera.right() - size)
+            y = self.next_static_bottom - size
+            coll = CircleCollider.acquire(Vector2(x, y), size)
         else:
-            verts = []
-            n = random.randint(3, 8)
-            offset_angle = random.random() * math.pi / 2
-            for i in range(n):
-                angle = math.pi * 2 / n * i + offset_angle
-                v_norm = Vector2(math.cos(angle), math.sin(angle))
-                verts.append(v_norm * size)
-            coll = PolygonCollider(Vector2(0, 0), verts)
-            x = random.randint(-1 * coll.bounds.left, Camera.right() - coll.bounds.right)
-            y = cls.next_static_bottom - coll.bounds.bottom
+            n = self.rng.randint(3, 8)
+            offset_angle = self.rng.random() * math.pi / 2
+            coll = PolygonCollider.acquire(Vector2(0, 0), ShapeTemplates.regular_polygon(n, size, offset_angle))
+            x = self.rng.randint(-1 * coll.bounds.left, self.world.camera.right() - coll.bounds.right)
+            y = self.next_static_bottom - coll.bounds.bottom
             coll.pos = Vector2(x, y)
         
-        platform = Platform(True, coll, cls.static_platform_color)
-        cls.current_platforms.append(platform)
-        cls.next_static_bottom = coll.bounds.top - cls.static_dist
+        platform = Platform.acquire(True, coll, self.static_platform_color)
+        self.__add(platform)
+        self.next_static_bottom = coll.bounds.top - self.static_dist
 
     # Create a dynamic platform
-    @classmethod
-    def __create_dynamic(cls):
-        left_side = random.random() < 0.5
-        size = random.randint(25, 150)
-        x_vel = random.randint(50, 200) * (1 if left_side else -1)
-
-        if (random.random() < 0.5):
-            x = -size if left_side else Camera.right() + size
-            y = random.randint(Camera.top() + size, Camera.bottom() - size)
-            coll = CircleCollider(Vector2(x, y), size)
+    def __create_dynamic(self):
+        camera = self.world.camera
+        left_side = self.rng.random() < 0.5
+        size = self.rng.randint(25, 150)
+        x_vel = self.rng.randint(50, 200) * (1 if left_side else -1)
+
+        if (self.rng.random() < 0.5):
+            x = -size if left_side else camera.right() + size
+            y = self.rng.randint(camera.top() + size, camera.bottom() - size)
+            coll = CircleCollider.acquire(Vector2(x, y), size)
         else:
-            verts = []
-            n = random.randint(3, 8)
-            offset_angle = random.random() * math.pi / 2
-            for i in range(n):
-                angle = math.pi * 2 / n * i + offset_angle
-                v_norm = Vector2(math.cos(angle), math.sin(angle))
-                verts.append(v_norm * size)
-            coll = PolygonCollider(Vector2(0, 0), verts)
-            x = coll.bounds.left if left_side else Camera.right() + coll.bounds.right
-            y = random.randint(Camera.top() + coll.bounds.top, Camera.bottom() + coll.bounds.bottom)
+            n = self.rng.randint(3, 8)
+            offset_angle = self.rng.random() * math.pi / 2
+            coll = PolygonCollider.acquire(Vector2(0, 0), ShapeTemplates.regular_polygon(n, size, offset_angle))
+            x = coll.bounds.left if left_side else camera.right() + coll.bounds.right
+            y = self.rng.randint(camera.top() + coll.bounds.top, camera.bottom() + coll.bounds.bottom)
             coll.pos = Vector2(x, y)
         
-        platform = Platform(False, coll, cls.dynamic_platform_color)
+        platform = Platform.acquire(False, coll, self.dynamic_platform_color)
         platform.vel = Vector2(x_vel, 0)
-        cls.current_platforms.append(platform)
+        self.__add(platform)
 
-    # Go over platforms to see if any are due for deletion
-    @classmethod
-    def __unload(cls):
-        n = len(cls.current_platforms)
-        i = 0
-        while (i < n):
-            if (cls.__unload_platform(i)):
-                cls.current_platforms.pop(i)
-                n -= 1
+    # Unload the platforms, which are below the screen or have moved off its sides
+    # Only the platforms at the front of the indexes are checked, so this is amortized O(1) per platform
+    def __unload(self):
+        bottom = self.world.camera.bottom()
+        while (len(self.__static_order) > 0 and self.__static_order[0].coll.bounds.top > bottom):
+            self.__unload_platform(self.__static_order.popleft())
+
+        while (len(self.__dynamic_by_top) > 0 and -self.__dynamic_by_top[0][0] > bottom):
+            _, spawn_id, p = heapq.heappop(self.__dynamic_by_top)
+            if (self.__is_alive(p, spawn_id)):
+                self.__unload_platform(p)
+
+        while (len(self.__dynamic_expiry) > 0 and self.__dynamic_expiry[0][0] <= self.world.time.time):
+            _, spawn_id, p = heapq.heappop(self.__dynamic_expiry)
+            if (not self.__is_alive(p, spawn_id)):
                 continue
-            i += 1
-    
-    # Can this platform be deleted
-    @classmethod
-    def __unload_platform(cls, index: int) -> bool:
-        p = cls.current_platforms[index]
+            # the expiry time is an early estimate, so the platform may still be on screen
+            if (self.__is_off_side(p)):
+                self.__unload_platform(p)
+            else:
+                self.__schedule_expiry(p)
 
-        if (p.coll.bounds.top > Camera.bottom()):
-            return True
-        
-        if (p.is_static):
-            return False
+        self.__compact_unload_indexes()
 
-        if (p.vel.x > 0 and p.coll.bounds.left > Camera.right()):
+    def __unload_platform(self, p: Platform):
+        self.__remove(p)
+        Platform.release(p)
+
+    # Is the heap entry still about this platform (released platforms get reused with a new spawn_id)
+    def __is_alive(self, p: Platform, spawn_id: int) -> bool:
+        return p.spawn_id == spawn_id and p in self.dynamic_platforms
+
+    def __is_off_side(self, p: Platform) -> bool:
+        bounds = p.coll.bounds
+        vel_x = p.vel.x
+        if (vel_x > 0 and bounds.left > self.world.camera.right()):
             return True
-        if (p.vel.x < 0 and p.coll.bounds.right < 0):
+        if (vel_x < 0 and bounds.right < 0):
             return True
         return False
 
+    # Static platforms are kept in order from the lowest to the highest
+    def __insert_static(self, platform: Platform):
+        top = platform.coll.bounds.top
+        if (len(self.__static_order) == 0 or self.__static_order[-1].coll.bounds.top >= top):
+            self.__static_order.append(platform)
+            return
+        # only when loading platforms out of height order
+        ordered = sorted([*self.__static_order, platform], key=lambda p: -p.coll.bounds.top)
+        self.__static_order = deque(ordered)
+
+    # Estimate when a dynamic platform has moved off the side of the screen (a step early, never late)
+    def __schedule_expiry(self, platform: Platform):
+        vel_x = platform.vel.x
+        if (vel_x == 0):
+            return
+        bounds = platform.coll.bounds
+        distance = self.world.camera.right() - bounds.left if vel_x > 0 else bounds.right
+        expiry = self.world.time.time + distance / abs(vel_x) - self.world.time.dt
+        # checked again at the next step at the earliest
+        expiry = max(expiry, self.world.time.time + self.world.time.dt / 2)
+        heapq.heappush(self.__dynamic_expiry, (expiry, platform.spawn_id, platform))
+
+    # Rebuild the heaps when most of their entries belong to removed platforms
+    def __compact_unload_indexes(self):
+        limit = 2 * len(self.dynamic_platforms) + 16
+        if (len(self.__dynamic_by_top) > limit):
+            self.__dynamic_by_top = [e for e in self.__dynamic_by_top if self.__is_alive(e[2], e[1])]
+            heapq.heapify(self.__dynamic_by_top)
+        if (len(self.__dynamic_expiry) > limit):
+            self.__dynamic_expiry = [e for e in self.__dynamic_expiry if self.__is_alive(e[2], e[1])]
+            heapq.heapify(self.__dynamic_expiry)
+
+    def __clear_unload_indexes(self):
+        self.__static_order.clear()
+        self.__dynamic_by_top.clear()
+        self.__dynamic_expiry.clear()
+
 # Platform Updating
 
     # Move dynamic platforms & check collision against player
-    @classmethod
-    def __update_platforms(cls):
-        for c in cls.current_platforms:
-            if (not c.is_static):
-                c.move()
-            
-            info = CollisionHandler.circle_collision(Player.instance.coll, c.coll)
+    def __update_platforms(self):
+        if (self.__store_active):
+            # only platforms, which moved to other cells need to be updated in the grid
+            for row in self.store.move(self.world.time.dt):
+                c = self.store.platforms[row]
+                self.grid.update(c, c.coll.bounds)
+        else:
+            for c in self.dynamic_platforms:
+                c.move(self.world.time.dt)
+                self.grid.update(c, c.coll.bounds)
+
+        for c, info in self.__player_collisions():
+            info.inherited_offset = Vector2(0, 0) if c.is_static else c.vel * self.world.time.dt
+            self.world.player.controller.add_to_buffer(info)
+
+    # (platform, collision info) pairs in spawn order
+    # The order of collisions affects their resolution, so keep it independent of the grid's history
+    def __player_collisions(self) -> list[tuple]:
+        player = self.world.player.coll
+        nearby = self.grid.query(player.bounds)
+        nearby.sort(key=lambda p: p.spawn_id)
+        if (HAS_NUMPY and self.batch_threshold is not None and len(nearby) >= self.batch_threshold):
+            results = BatchCollisionHandler.circle_collision(player, [p.coll for p in nearby])
+            return [(nearby[i], info) for i, info in enumerate(results) if info is not None]
+
+        collisions = []
+        for c in nearby:
+            info = CollisionHandler.circle_collision(player, c.coll)
             if (info is not None):
-                info.inherited_offset = Vector2(0, 0) if c.is_static else c.vel * Time.dt
-                Player.instance.controller.add_to_buffer(info)
+                collisions.append((c, info))
+        return collisions
@@ -0,0 +1,104 @@
+from pygame.math import Vector2
+from physics.colliders import Collider, CircleCollider
+from utils.optional import np
+
+# Platform state in contiguous arrays (structure of arrays)
+
+class PlatformStore:
+    """
+    Keeps the positions, velocities, radii, flags & bounds of platforms in NumPy arrays,
+    so that all of them can be moved & checked in a single vectorized step.\n
+    Rows are kept contiguous: removing a platform moves the last row in its place.
+    """
+    def __init__(self, cell_size: int, capacity: int = 64):
+        """cell_size = the cell size of the spatial hash the platforms are stored in"""
+        self.cell_size = cell_size
+        self.platforms = []
+        # incremented after every move, so platforms know when their colliders are out of date
+        self.epoch = 0
+        self.__allocate(capacity)
+
+    def __len__(self) -> int:
+        return len(self.platforms)
+
+    def __allocate(self, capacity: int):
+        self.pos = np.zeros((capacity, 2))
+        self.prev_pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.radius = np.zeros(capacity)
+        self.is_static = np.zeros(capacity, dtype=bool)
+        # local bounds (left, top, width, height) & padded world space bounds (left, top, right, bottom)
+        self.local_bounds = np.zeros((capacity, 4))
+        self.bounds = np.zeros((capacity, 4))
+        # the range of spatial hash cells each platform occupies (min x, min y, max x, max y)
+        self.cells = np.zeros((capacity, 4), dtype=np.int64)
+
+    def __grow(self):
+        n = len(self.platforms)
+        old = (self.pos, self.prev_pos, self.vel, self.radius, self.is_static,
+               self.local_bounds, self.bounds, self.cells)
+        self.__allocate(max(1, n) * 2)
+        new = (self.pos, self.prev_pos, self.vel, self.radius, self.is_static,
+               self.local_bounds, self.bounds, self.cells)
+        for old_array, new_array in zip(old, new):
+            new_array[:n] = old_array[:n]
+
+    # The platform's state is copied into the store, after which the store owns it
+    def add(self, platform, vel: Vector2):
+        if (len(self.platforms) == len(self.pos)):
+            self.__grow()
+        row = len(self.platforms)
+        coll = platform.coll
+        self.platforms.append(platform)
+        self.pos[row] = self.prev_pos[row] = (coll.pos.x, coll.pos.y)
+        self.vel[row] = (vel.x, vel.y)
+        self.radius[row] = coll.radius if isinstance(coll, CircleCollider) else 0
+        self.is_static[row] = platform.is_static
+        local = coll.local_bounds
+        self.local_bounds[row] = (local.left, local.top, local.width, local.height)
+        self.__compute_bounds(slice(row, row + 1))
+        return row
+
+    # Returns the platform, which was moved into the removed row (None if it was the last row)
+    def remove(self, row: int):
+        last = len(self.platforms) - 1
+        moved = None
+        if (row != last):
+            for array in (self.pos, self.prev_pos, self.vel, self.radius, self.is_static,
+                          self.local_bounds, self.bounds, self.cells):
+                array[row] = array[last]
+            moved = self.platforms[last]
+            self.platforms[row] = moved
+        self.platforms.pop()
+        return moved
+
+    # Move every dynamic platform & update their bounds
+    # Returns the rows, which moved to different spatial hash cells
+    def move(self, dt: float):
+        n = len(self.platforms)
+        dynamic = ~self.is_static[:n]
+        self.pos[:n][dynamic] += self.vel[:n][dynamic] * dt
+        self.epoch += 1
+        old_cells = self.cells[:n].copy()
+        self.__compute_bounds(slice(0, n))
+        return np.flatnonzero(np.any(self.cells[:n] != old_cells, axis=1))
+
+    # The same padded integer bounds as Collider.bounds & the cells SpatialHash would place them in
+    def __compute_bounds(self, rows: slice):
+        pad = Collider.BoundsPadding
+        local = self.local_bounds[rows]
+        left = np.trunc(local[:, 0] + self.pos[rows, 0] - pad)
+        top = np.trunc(local[:, 1] + self.pos[rows, 1] - pad)
+        right = left + local[:, 2] + 2 * pad
+        bottom = top + local[:, 3] + 2 * pad
+        self.bounds[rows] = np.stack((left, top, right, bottom), axis=1)
+        s = self.cell_size
+        self.cells[rows] = np.stack((left // s, top // s,
+                                     np.maximum(right - 1, left) // s, np.maximum(bottom - 1, top) // s), axis=1)
+
+    def store_positions(self):
+        n = len(self.platforms)
+        self.prev_pos[:n] = self.pos[:n]
+
+    def clear(self):
+        self.platforms.clear()
@@ -1,24 +1,59 @@
+import os
 import sys
+import time
 import pygame
-from pygame.math import Vector2
-from utils.data.time import Time
 from utils.gui.stage import Stage
 from utils.gui.ui_manager import UIManager
-from utils.environment.platform_manager import PlatformManager
-from utils.data.statistics import StatHandler, DeathType
-from utils.game_state import GameStateHandler, State
+from utils.game_state import State
 from utils.data.save_data import SaveManager
+from utils.data.save_writer import SaveWriter
+from utils.data.replay import Replay, ReplayRecorder, ReplayInput
+from utils.data.world_state import WorldState
+from utils.input_source import InputSource, KeyboardInput
+from utils.profiler import Profiler
+from utils.settings import Settings
+from utils.world import World
 from entities.player import Player
 
-# Manages the game session
+# Manages the game session: the window, events & saving around a single World
 
 class GameManager:
+    WIDTH = 1200
+    HEIGHT = 1000
+
     # Initializes the game session variables etc
-    def __init__(self):
-        pygame.init()
+    def __init__(self, headless: bool = False, input_source: InputSource = None, settings: Settings = None):
+        """
+        headless = no window, rendering or clock; run frames with simulate()\n
+        input_source = drives the player (keyboard by default, idle when headless)\n
+        settings = simulation & session options (see Settings)
+        """
+        self.headless = headless
+        self.settings = Settings() if settings is None else settings
+        self.frames = 0
+        seed = self.settings.seed
+        if (self.settings.replay_dir is not None and seed is not None and not Replay.is_valid_seed(seed)):
+            raise ValueError(f"replay seeds must fit in 32 bits: {seed}")
+        self.recorder: ReplayRecorder = None
+        # replays saved this session (part of their file names)
+        self.replay_count = 0
+        if (input_source is None):
+            input_source = InputSource() if headless else KeyboardInput()
+        self.input_source = input_source
+        self.world = World(GameManager.WIDTH, GameManager.HEIGHT, input_source, self.settings)
+
+        if (headless):
+            Stage.initialize_headless(GameManager.WIDTH, GameManager.HEIGHT)
+            self.initialize()
+            return
+
+        # only the display (& the event queue & keyboard with it) is needed: fonts are loaded on first use
+        # and the remaining modules (ie. audio) are never used
+        pygame.display.init()
 
         pygame.display.set_caption("Physics Based Platformer")
-        Stage.initialize(pygame.display.set_mode((1200, 1000)))
+        Stage.initialize(pygame.display.set_mode((GameManager.WIDTH, GameManager.HEIGHT)))
+        Stage.set_dirty_rects(self.settings.dirty_rects)
         UIManager.initialize()
 
         self.clock = pygame.time.Clock()
@@ -29,56 +64,92 @@ class GameManager:
 
     # Initializes individual game related variables
     def initialize(self):
-        self.player = Player(Vector2(600, 600), 30)
-        PlatformManager.begin()
-        GameStateHandler.state = State.RUNNING
+        if (self.settings.replay_dir is not None):
+            self.recorder = ReplayRecorder(self.input_source, self.world)
+            self.world.input_source = self.recorder
+        self.world.begin()
+
+    @property
+    def player(self) -> Player:
+        return self.world.player
 
     # Loads external assets
     def load_content(self):
-        StatHandler.initialize(SaveManager.decode())
+        self.world.stats.initialize(SaveManager.load())
 
     # Updates game state
+    # Physics runs in fixed steps, as many as the real time elapsed allows
     def update(self):
         while (True):
             self.check_events()
-            Time.update(self.clock)
+            self.world.time.update(self.clock)
 
-            if (GameStateHandler.state == State.RUNNING):
-                self.gameplay_loop()
+            while (self.world.time.next_step()):
+                self.world.check_gameover()
+                self.world.store_previous_state()
+                if (self.world.state != State.RUNNING):
+                    continue
+                self.world.step()
 
-            self.update_screen()
+            if (Profiler.enabled):
+                Profiler.measure('update_screen', self.update_screen)
+            else:
+                self.update_screen()
+            if (self.settings.report_startup and self.frames == 0):
+                print(f"first frame at {time.perf_counter()}", flush=True)
+            self.frames += 1
+            if (self.settings.max_frames is not None and self.frames >= self.settings.max_frames):
+                self.on_exit()
             self.clock.tick(60)
 
-    # Updates entities etc
-    def gameplay_loop(self):
-        self.player.update()
-        PlatformManager.update()
-        self.player.controller.collision_response()
-        self.player.camera.update()
-        StatHandler.update_score(self.player.coll.bounds.bottom)
-    
+    # Runs the game without rendering as fast as possible (one physics step per frame)
+    # Returns the number of frames simulated, which is less than max_frames on gameover
+    def simulate(self, max_frames: int) -> int:
+        return self.world.simulate(max_frames)
+
+    # Plays back a recorded run headlessly, starting from the given frame
+    # Seeking restores the closest keyframe instead of simulating from frame zero
+    # continuous_collision must match the recorded run
+    @classmethod
+    def from_replay(cls, replay: Replay, start_frame: int = 0, continuous_collision: bool = False) -> 'GameManager':
+        source = ReplayInput(replay)
+        game = GameManager(headless=True, input_source=source,
+                           settings=Settings(seed=replay.seed, continuous_collision=continuous_collision))
+        game.world.time.dt = replay.dt
+        keyframe = replay.keyframe_before(start_frame)
+        if (keyframe is not None):
+            WorldState.restore(keyframe[1], game.world)
+            source.frame = keyframe[0]
+        game.simulate(start_frame - source.frame)
+        return game
+
     # Rendering phase of the update cycle
     def update_screen(self):
-        if (GameStateHandler.state == State.ENDED):
-            UIManager.gameover_view()
+        world = self.world
+        alpha = world.time.alpha
+        Stage.interpolate(world.prev_offset, world.offset, alpha)
+        Stage.begin_frame()
+        if (world.state == State.ENDED):
+            UIManager.gameover_view(world.stats)
         else:
             Stage.draw_background()
 
-            PlatformManager.draw()
-            self.player.draw()
+            world.platforms.draw(alpha)
+            world.player.draw(alpha)
 
-            if (GameStateHandler.state == State.PAUSED):
-                UIManager.pause_view()
+            if (world.state == State.PAUSED):
+                UIManager.pause_view(world.stats)
             else:
-                UIManager.game_view()
+                UIManager.game_view(world.stats)
+
+        if (Profiler.overlay):
+            UIManager.profiler_view()
 
-        pygame.display.flip()
+        Stage.present()
     
     # Checks events for gameover, quitting, resetting and pausing
     def check_events(self):
-        if (GameStateHandler.state == State.RUNNING):
-            if (self.player.camera.is_below_frustum()):
-                GameStateHandler.on_gameover(DeathType.FALL)
+        self.world.check_gameover()
 
         for event in pygame.event.get():
             if (event.type == pygame.QUIT):
@@ -87,21 +158,42 @@ class GameManager:
             if (event.type != pygame.KEYDOWN):
                 continue
             
-            if (GameStateHandler.state == State.ENDED):
+            if (self.world.state == State.ENDED):
                 if (event.key == pygame.K_RETURN):
                     self.reset()
             if (event.key == pygame.K_ESCAPE):
-                GameStateHandler.on_pause()
+                self.world.game_state.on_pause()
+            if (event.key == pygame.K_F3):
+                Profiler.toggle()
 
     # Restarts the game
     def reset(self):
-        StatHandler.save()
-        Stage.Offset = Vector2(0, 0)
-        PlatformManager.reset()
-        Player.instance = None
+        self.world.stats.save(self.world.run_record())
+        self.save_replay()
+        self.restart()
+
+    # Clears the previous game and starts a new one
+    def restart(self):
+        Stage.reset_offset()
         self.initialize()
 
     # Handles quitting
     def on_exit(self):
-        StatHandler.save()
+        self.world.stats.save(self.world.run_record())
+        self.save_replay()
+        SaveWriter.flush(SaveWriter.exit_timeout)
+        if (Profiler.dump_path is not None):
+            Profiler.dump(Profiler.dump_path)
         sys.exit()
+
+    # Saves the recording of the current run, if recording
+    # Returns the path of the replay (None if not recording)
+    def save_replay(self) -> str:
+        if (self.recorder is None):
+            return None
+        # runs with the same seed (ie. every run with a fixed seed) get files of their own
+        self.replay_count += 1
+        name = f"{self.world.platforms.seed}_{time.strftime('%Y%m%d_%H%M%S')}_{self.replay_count}.replay"
+        path = os.path.join(self.settings.replay_dir, name)
+        self.recorder.to_replay().save(path)
+        return path
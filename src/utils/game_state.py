@@ -8,18 +8,19 @@ class State(Enum):
 
 # Manages game states
 class GameStateHandler:
-    state : State = None
+    def __init__(self, stats: StatHandler):
+        """Game state of a single world, whose deaths are counted in stats."""
+        self.stats = stats
+        self.state: State = None
 
-    @classmethod
-    def on_pause(cls):
-        if (cls.state == State.ENDED):
+    def on_pause(self):
+        if (self.state == State.ENDED):
             return
-        if (cls.state == State.RUNNING):
-            cls.state = State.PAUSED
+        if (self.state == State.RUNNING):
+            self.state = State.PAUSED
         else:
-            cls.state = State.RUNNING
+            self.state = State.RUNNING
 
-    @classmethod
-    def on_gameover(cls, death_type: DeathType):
-        StatHandler.initiate_death(death_type)
-        cls.state = State.ENDED
+    def on_gameover(self, death_type: DeathType):
+        self.stats.initiate_death(death_type)
+        self.state = State.ENDED
@@ -1,58 +1,57 @@
 from pygame.math import lerp
-from utils.gui.stage import Stage
-from utils.data.time import Time
 from entities.entity import Entity
 
 # Controls the movement of the screen
 
 class Camera:
-    def __init__(self, entity: Entity):
-        """Camera component of entity, which allows the screen to follow the entity."""
+    def __init__(self, world, entity: Entity):
+        """Camera component of entity, which allows the screen (world.offset) to follow the entity."""
+        self.world = world
         # parent
         self.entity = entity
         # linear interpolation speed (easing speed)
+        # A physics step at reference_dt leaves lerp_speed * reference_dt of the distance to the boundary
         self.lerp_speed = 10
+        self.reference_dt = 1 / 60
         # if the player's distance from the camera's top is this
         # the screen should move
         self.boundary = 300
 
     def update(self):
-        if (not self.__should_move()):
+        bottom = self.entity.coll.bounds.bottom
+        if (not self.__should_move(bottom)):
             return
         
-        delta = self.entity.coll.bounds.bottom - Camera.top() - self.boundary
-        Stage.Offset.y += lerp(delta, 0, self.lerp_speed * Time.dt)
+        delta = bottom - self.top() - self.boundary
+        # compounded over the steps, so the camera follows equally fast at any physics rate
+        # (a weight of lerp_speed * dt would exceed 1 below 10 Hz)
+        steps = self.world.time.dt / self.reference_dt
+        self.world.offset.y += lerp(delta, 0, (self.lerp_speed * self.reference_dt) ** steps)
 
-    def __should_move(self) -> bool:
-        return self.entity.coll.bounds.bottom < Camera.top() + self.boundary
+    def __should_move(self, bottom: int) -> bool:
+        return bottom < self.top() + self.boundary
 
     def is_below_frustum(self) -> bool:
-        return self.entity.coll.bounds.top > Camera.bottom()
+        return self.entity.coll.bounds.top > self.bottom()
 
 # Bounds
 
-    @classmethod
-    def left(cls) -> int:
-        return int(Stage.Offset.x)
+    def left(self) -> int:
+        return int(self.world.offset.x)
     
-    @classmethod
-    def right(cls) -> int:
-        return int(Stage.WIDTH + Stage.Offset.x)
+    def right(self) -> int:
+        return int(self.world.width + self.world.offset.x)
     
-    @classmethod
-    def top(cls) -> int:
-        return int(Stage.Offset.y)
+    def top(self) -> int:
+        return int(self.world.offset.y)
     
-    @classmethod
-    def bottom(cls) -> int:
-        return int(Stage.HEIGHT + Stage.Offset.y)
+    def bottom(self) -> int:
+        return int(self.world.height + self.world.offset.y)
     
 # Center Coordinates
 
-    @classmethod
-    def horizontal_center(cls) -> int:
-        return (cls.left() + cls.right()) // 2
+    def horizontal_center(self) -> int:
+        return (self.left() + self.right()) // 2
     
-    @classmethod
-    def vertical_center(cls) -> int:
-        return (cls.top() + cls.bottom()) // 2
+    def vertical_center(self) -> int:
+        return (self.top() + self.bottom()) // 2
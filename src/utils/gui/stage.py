@@ -1,5 +1,7 @@
+from collections import OrderedDict
 import pygame
 from pygame.math import Vector2
+from pygame.rect import Rect
 from pygame.surface import Surface
 
 # Handle Drawing & Window Properties
@@ -8,33 +10,267 @@ class Stage:
     """A tool used to draw elements on screen."""
     WIDTH = 0
     HEIGHT = 0
-    Offset = Vector2(0, 0)
+    # the interpolated camera offset of the world being drawn
+    RenderOffset = Vector2(0, 0)
 
     __stage: Surface = None
     __back_col = (20, 0, 30)
 
+    # Shapes are rasterized once per (shape, color) & blitted afterwards (least recently used are evicted)
+    sprite_cache_size = 256
+    __sprites: OrderedDict = OrderedDict()
+    sprite_hits = 0
+    sprite_misses = 0
+    __sprite_key = (255, 0, 255)
+    # vertex lists reused by draw_polygon (one per vertex count), so drawing doesn't build new ones
+    __vertex_buffers: dict[int, list[Vector2]] = {}
+
+    # Dirty rectangle mode: drawing is recorded during the frame & compared against the previous frame
+    # Only the areas, which changed are redrawn & pushed to the display (the whole screen when the camera scrolls)
+    dirty_rects = False
+    # above this many changed areas they are merged into one, above this share of the screen it's fully redrawn
+    max_dirty_rects = 32
+    max_dirty_area = 0.5
+    # (surface, x, y) for blits, (None, color, points) for polygons
+    __commands: list[tuple] = []
+    __background: tuple = None
+    __prev_rects: dict[tuple, Rect] = {}
+    __prev_background: tuple = None
+    __prev_offset = Vector2(0, 0)
+    __full_redraw = True
+
     @classmethod
     def initialize(cls, surf: Surface):
         cls.__stage = surf
         cls.WIDTH = surf.get_width()
         cls.HEIGHT = surf.get_height()
+        cls.__full_redraw = True
+
+    # Stage without a display surface (nothing may be drawn)
+    @classmethod
+    def initialize_headless(cls, width: int, height: int):
+        cls.__stage = None
+        cls.WIDTH = width
+        cls.HEIGHT = height
+
+    @classmethod
+    def reset_offset(cls):
+        cls.RenderOffset = Vector2(0, 0)
+
+    # alpha = how far between the previous & current camera offset (of a World) to draw [0, 1]
+    @classmethod
+    def interpolate(cls, prev_offset: Vector2, offset: Vector2, alpha: float):
+        cls.RenderOffset = prev_offset.lerp(offset, alpha)
 
     @classmethod
     def draw_background(cls):
-        cls.__stage.fill(cls.__back_col)
+        cls.draw_custom_background(cls.__back_col)
 
     @classmethod
     def draw_custom_background(cls, bg: tuple):
+        if (cls.dirty_rects):
+            cls.__background = bg
+            cls.__commands.clear()
+            return
         cls.__stage.fill(bg)
 
     @classmethod
     def draw_ui_element(cls, surf: Surface, pos: tuple):
+        cls.__blit(surf, pos)
+
+    # offset = added to the world space position (used for interpolation)
+    # Shapes outside the screen are skipped
+    @classmethod
+    def draw_circle(cls, pos: Vector2, radius: float, color: tuple, offset: Vector2 = None):
+        size = int(radius) * 2 + 2
+        corner = cls.__screen_corner(pos, -size / 2, -size / 2, offset)
+        if (not cls.__on_screen(corner, size, size)):
+            return
+        key = ('circle', radius, color)
+        sprite = cls.__get_sprite(key)
+        if (sprite is None):
+            sprite = cls.__new_sprite(key, size, size)
+            pygame.draw.circle(sprite, color, (size / 2, size / 2), radius)
+        cls.__blit(sprite, corner)
+
+    # A polygon shape (local space data shared by colliders, see PolygonShape) at the given world space position
+    @classmethod
+    def draw_shape(cls, shape, pos: Vector2, color: tuple, offset: Vector2 = None):
+        b = shape.bounds
+        # a pixel of margin on every side, since the bounds are truncated to integers
+        width, height = b.width + 3, b.height + 3
+        corner = cls.__screen_corner(pos, b.left - 1, b.top - 1, offset)
+        if (not cls.__on_screen(corner, width, height)):
+            return
+        key = (shape, color)
+        sprite = cls.__get_sprite(key)
+        if (sprite is None):
+            sprite = cls.__new_sprite(key, width, height)
+            pygame.draw.polygon(sprite, color, [(v.x - b.left + 1, v.y - b.top + 1) for v in shape.vertices])
+        cls.__blit(sprite, corner)
+
+    # Any polygon in world space (drawn directly, without caching)
+    @classmethod
+    def draw_polygon(cls, vertices: list, color: tuple, offset: Vector2 = None):
+        screen_offset = cls.RenderOffset if offset is None else cls.RenderOffset - offset
+        buffer = cls.__vertex_buffers.get(len(vertices))
+        if (buffer is None):
+            buffer = cls.__vertex_buffers[len(vertices)] = [Vector2(0, 0) for _ in vertices]
+        for v, b in zip(vertices, buffer):
+            b.update(v.x - screen_offset.x, v.y - screen_offset.y)
+        if (cls.dirty_rects):
+            cls.__commands.append((None, color, tuple((round(b.x), round(b.y)) for b in buffer)))
+            return
+        pygame.draw.polygon(cls.__stage, color, buffer)
+
+    @classmethod
+    def __blit(cls, surf: Surface, pos: tuple):
+        if (cls.dirty_rects):
+            cls.__commands.append((surf, round(pos[0]), round(pos[1])))
+            return
         cls.__stage.blit(surf, pos)
 
+    # Screen position of a sprite, whose top left corner is at (dx, dy) relative to pos
+    @classmethod
+    def __screen_corner(cls, pos: Vector2, dx: float, dy: float, offset: Vector2) -> tuple:
+        screen_offset = cls.RenderOffset if offset is None else cls.RenderOffset - offset
+        return (round(pos.x + dx - screen_offset.x), round(pos.y + dy - screen_offset.y))
+
+    @classmethod
+    def __on_screen(cls, corner: tuple, width: int, height: int) -> bool:
+        return corner[0] < cls.WIDTH and corner[1] < cls.HEIGHT and corner[0] + width > 0 and corner[1] + height > 0
+
+    @classmethod
+    def __get_sprite(cls, key: tuple) -> Surface:
+        sprite = cls.__sprites.get(key)
+        if (sprite is not None):
+            cls.sprite_hits += 1
+            cls.__sprites.move_to_end(key)
+        return sprite
+
+    @classmethod
+    def __new_sprite(cls, key: tuple, width: int, height: int) -> Surface:
+        cls.sprite_misses += 1
+        # colorkeyed (RLE encoded after the shape is drawn) is faster to blit than per-pixel alpha
+        sprite = Surface((int(width), int(height)))
+        if (pygame.display.get_surface() is not None):
+            sprite = sprite.convert()
+        sprite.fill(cls.__sprite_key)
+        sprite.set_colorkey(cls.__sprite_key, pygame.RLEACCEL)
+        cls.__sprites[key] = sprite
+        if (len(cls.__sprites) > cls.sprite_cache_size):
+            cls.__sprites.popitem(last=False)
+        return sprite
+
+    @classmethod
+    def sprite_stats(cls) -> dict:
+        total = cls.sprite_hits + cls.sprite_misses
+        return {'size': len(cls.__sprites), 'max_size': cls.sprite_cache_size, 'hits': cls.sprite_hits,
+                'misses': cls.sprite_misses, 'hit_rate': cls.sprite_hits / total if total > 0 else 0}
+
+    @classmethod
+    def clear_sprites(cls):
+        cls.__sprites.clear()
+        cls.sprite_hits = 0
+        cls.sprite_misses = 0
+
+# Dirty Rectangle Rendering
+
+    @classmethod
+    def set_dirty_rects(cls, enabled: bool):
+        cls.dirty_rects = enabled
+        cls.__commands = []
+        cls.__full_redraw = True
+
+    # Called before anything is drawn in a frame
+    @classmethod
+    def begin_frame(cls):
+        if (cls.dirty_rects):
+            cls.__commands = []
+            cls.__background = None
+
+    # Push the frame to the display
+    @classmethod
+    def present(cls):
+        if (not cls.dirty_rects):
+            pygame.display.flip()
+            return
+        rects = cls.render_frame()
+        if (rects is None):
+            pygame.display.flip()
+        elif (len(rects) > 0):
+            pygame.display.update(rects)
+
+    # Draw the frame recorded in dirty rectangle mode
+    # Returns the areas of the screen, which changed (None = the whole screen)
+    @classmethod
+    def render_frame(cls) -> list[Rect]:
+        commands = cls.__commands
+        current = {cls.__command_key(c): c for c in commands}
+        rects = None
+        if (not cls.__full_redraw and cls.__background == cls.__prev_background
+                and cls.RenderOffset == cls.__prev_offset):
+            rects = cls.__changed_rects(current)
+
+        if (rects is None):
+            if (cls.__background is not None):
+                cls.__stage.fill(cls.__background)
+            for c in commands:
+                cls.__draw_command(c)
+        else:
+            # only the changed areas are cleared & redrawn, everything else stays as it is on screen
+            for rect in rects:
+                cls.__redraw_rect(rect, commands)
+            cls.__stage.set_clip(None)
+
+        cls.__prev_rects = {key: cls.__command_rect(c) for key, c in current.items()}
+        cls.__prev_background = cls.__background
+        cls.__prev_offset = Vector2(cls.RenderOffset)
+        cls.__full_redraw = False
+        return rects
+
+    # Clear an area of the screen & draw the commands overlapping it
+    @classmethod
+    def __redraw_rect(cls, rect: Rect, commands: list[tuple]):
+        cls.__stage.set_clip(rect)
+        cls.__stage.fill(cls.__background)
+        for c in commands:
+            if (rect.colliderect(cls.__command_rect(c))):
+                cls.__draw_command(c)
+
+    # Areas covered by commands, which were drawn in only one of the frames (None = too much changed)
+    @classmethod
+    def __changed_rects(cls, current: dict) -> list[Rect]:
+        screen = Rect(0, 0, cls.WIDTH, cls.HEIGHT)
+        changed = [cls.__command_rect(c) for key, c in current.items() if key not in cls.__prev_rects]
+        changed += [r for key, r in cls.__prev_rects.items() if key not in current]
+        changed = [r.clip(screen) for r in changed]
+        changed = [r for r in changed if r.width > 0 and r.height > 0]
+        if (len(changed) > cls.max_dirty_rects):
+            changed = [changed[0].unionall(changed[1:])]
+        if (sum(r.width * r.height for r in changed) > cls.max_dirty_area * cls.WIDTH * cls.HEIGHT):
+            return None
+        return changed
+
+    # Commands are identified by the surface object & position (surfaces are cached, so unchanged ones match)
+    # Surfaces are hashed by identity (the previous frame's keys keep its surfaces alive for the comparison)
+    @classmethod
+    def __command_key(cls, command: tuple) -> tuple:
+        if (command[0] is None):
+            return command[1:]
+        return command
+
     @classmethod
-    def draw_circle(cls, pos: Vector2, radius: float, color: tuple):
-        pygame.draw.circle(cls.__stage, color, pos - cls.Offset, radius)
+    def __command_rect(cls, command: tuple) -> Rect:
+        if (command[0] is None):
+            xs = [p[0] for p in command[2]]
+            ys = [p[1] for p in command[2]]
+            return Rect(min(xs), min(ys), max(xs) - min(xs) + 2, max(ys) - min(ys) + 2)
+        return Rect(command[1], command[2], command[0].get_width(), command[0].get_height())
 
     @classmethod
-    def draw_polygon(cls, vertices: list, color: tuple):
-        pygame.draw.polygon(cls.__stage, color, [v - cls.Offset for v in vertices])
+    def __draw_command(cls, command: tuple):
+        if (command[0] is None):
+            pygame.draw.polygon(cls.__stage, command[1], command[2])
+        else:
+            cls.__stage.blit(command[0], (command[1], command[2]))
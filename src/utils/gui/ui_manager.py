@@ -1,7 +1,13 @@
+import json
+import os
+from collections import OrderedDict
 from enum import Enum
 from pygame import font
 from utils.gui.stage import Stage, Surface
 from utils.data.statistics import StatHandler
+from utils.data.save_writer import SaveWriter
+from utils.data.run_history import RunHistory
+from utils.profiler import Profiler
 
 # Moves the anchor or origin of a UI element
 class Anchor(Enum):
@@ -23,12 +29,23 @@ class FontSize(Enum):
 
 # Manages fonts
 class Fonts:
+    """
+    Fonts are loaded on first use. Finding a system font scans every installed font (fc-list on Linux),
+    so the resolved file is cached in cache_path & the scan only happens once per machine.
+    The FONT_CACHE environment variable moves the cache (ie. for benchmarks).
+    """
+    name = 'Arial'
+    sizes = {FontSize.SMALL: 20, FontSize.MEDIUM: 30, FontSize.LARGE: 40}
+    cache_path = os.environ.get('FONT_CACHE', "src/assets/font_cache.json")
+
     small : font.Font = None
     medium : font.Font = None
     large : font.Font = None
 
     @classmethod
     def get_font(cls, size: FontSize) -> font.Font:
+        if (cls.small is None):
+            cls.load()
         if (size == FontSize.SMALL):
             return cls.small
         if (size == FontSize.MEDIUM):
@@ -37,26 +54,102 @@ class Fonts:
             return cls.large
         return None
 
+    @classmethod
+    def load(cls):
+        if (not font.get_init()):
+            font.init()
+        path = cls.resolve()
+        cls.small = font.Font(path, cls.sizes[FontSize.SMALL])
+        cls.medium = font.Font(path, cls.sizes[FontSize.MEDIUM])
+        cls.large = font.Font(path, cls.sizes[FontSize.LARGE])
+
+    # Unload the fonts (they're loaded again when needed)
+    @classmethod
+    def clear(cls):
+        cls.small = None
+        cls.medium = None
+        cls.large = None
+
+    # The file of the font (None = pygame's default font, when it's not installed)
+    @classmethod
+    def resolve(cls) -> str:
+        cache = {}
+        if (os.path.exists(cls.cache_path)):
+            # a corrupt cache is a miss & gets overwritten
+            try:
+                with open(cls.cache_path, 'r', encoding='utf-8') as target:
+                    cache = json.loads(target.read())
+            except (OSError, ValueError):
+                cache = {}
+            if (not isinstance(cache, dict)):
+                cache = {}
+        # a cached file may have been uninstalled since
+        if (cls.name in cache and (cache[cls.name] is None or os.path.exists(cache[cls.name]))):
+            return cache[cls.name]
+
+        cache[cls.name] = font.match_font(cls.name)
+        directory = os.path.dirname(cls.cache_path)
+        if (directory != '' and not os.path.exists(directory)):
+            os.makedirs(directory)
+        temporary = cls.cache_path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as target:
+            target.write(json.dumps(cache))
+        os.replace(temporary, cls.cache_path)
+        return cache[cls.name]
+
 # Manages UI elements
 
 class UIManager:
     """Used to create UI elements."""
+    # Rendered text surfaces keyed by (text, size, color), least recently used are evicted
+    # Static labels stay cached, so drawing them costs only a blit
+    text_cache_size = 64
+    __text_cache: OrderedDict = OrderedDict()
+    text_hits = 0
+    text_misses = 0
+    # darkens the game behind the pause screen (created once)
+    __overlay: Surface = None
+
+    # Fonts are loaded when the first text is drawn (see Fonts)
+    # Text rendered with the previous fonts is dropped along with them
     @classmethod
     def initialize(cls):
-        Fonts.small = font.SysFont('Arial', 20)
-        Fonts.medium = font.SysFont('Arial', 30)
-        Fonts.large = font.SysFont('Arial', 40)
+        Fonts.clear()
+        cls.clear_text_cache()
+
+    # The rendered surface of the text (cached)
+    @classmethod
+    def get_text(cls, text: str, size: FontSize = FontSize.SMALL, color: tuple = (255, 255, 255)) -> Surface:
+        key = (text, size, color)
+        surf = cls.__text_cache.get(key)
+        if (surf is not None):
+            cls.text_hits += 1
+            cls.__text_cache.move_to_end(key)
+            return surf
+
+        cls.text_misses += 1
+        surf = Fonts.get_font(size).render(text, True, color)
+        cls.__text_cache[key] = surf
+        if (len(cls.__text_cache) > cls.text_cache_size):
+            cls.__text_cache.popitem(last=False)
+        return surf
+
+    @classmethod
+    def clear_text_cache(cls):
+        cls.__text_cache.clear()
+        cls.text_hits = 0
+        cls.text_misses = 0
 
     # Renders text in normal screen space
     @classmethod
     def render_text(cls, text: str, pos: tuple, size: FontSize = FontSize.SMALL, color: tuple = (255, 255, 255)):
-        Stage.draw_ui_element(Fonts.get_font(size).render(text, True, color), pos)
+        Stage.draw_ui_element(cls.get_text(text, size, color), pos)
 
     # Renders text using the given anchor
     @classmethod
     def render_text_anchored(cls, text: str, anchor: FontAnchor, offset: tuple, 
                              size: FontSize = FontSize.SMALL, color: tuple = (255, 255, 255)):
-        surf = Fonts.get_font(size).render(text, True, color)
+        surf = cls.get_text(text, size, color)
         x = offset[0]
         y = offset[1]
 
@@ -74,30 +167,62 @@ class UIManager:
 
     # Render the UI during gameplay
     @classmethod
-    def game_view(cls):
-        cls.render_text(f"SCORE: {StatHandler.score:.0f}", (10, 10))
+    def game_view(cls, stats: StatHandler):
+        cls.render_text(f"SCORE: {stats.score:.0f}", (10, 10))
         cls.render_text_anchored("press ESC to pause", FontAnchor(Anchor.LEFT, Anchor.RIGHT), (10, -10), color=(160, 160, 160))
 
     # Render the pause screen UI
     @classmethod
-    def pause_view(cls):
-        cls.render_text(f"SCORE: {StatHandler.score:.0f}", (10, 10))
-        darken = Surface((Stage.WIDTH, Stage.HEIGHT))
-        darken.set_alpha(160)
-        Stage.draw_ui_element(darken, (0, 0))
+    def pause_view(cls, stats: StatHandler):
+        cls.render_text(f"SCORE: {stats.score:.0f}", (10, 10))
+        Stage.draw_ui_element(cls.__get_overlay(), (0, 0))
         cls.render_text_anchored("PAUSED", FontAnchor(Anchor.CENTER, Anchor.CENTER), (0, -100), FontSize.LARGE)
         cls.render_text_anchored("press ESC to continue", FontAnchor(Anchor.LEFT, Anchor.RIGHT), (10, -10))
 
     # Render the gameover screen
     @classmethod
-    def gameover_view(cls):
+    def gameover_view(cls, stats: StatHandler):
         Stage.draw_custom_background((0, 0, 0))
         cls.render_text_anchored(
             "GAMEOVER", FontAnchor(Anchor.CENTER, Anchor.CENTER), (0, -100), FontSize.LARGE, (255, 128, 128))
         cls.render_text_anchored(
-            StatHandler.death_msg, FontAnchor(Anchor.CENTER, Anchor.CENTER), (0, -50), FontSize.SMALL, (160, 160, 160))
+            stats.death_msg, FontAnchor(Anchor.CENTER, Anchor.CENTER), (0, -50), FontSize.SMALL, (160, 160, 160))
         cls.render_text_anchored(
-            f"Final Score: {StatHandler.score:.0f}", FontAnchor(Anchor.CENTER, Anchor.CENTER), 
+            f"Final Score: {stats.score:.0f}", FontAnchor(Anchor.CENTER, Anchor.CENTER), 
             (0, 0), FontSize.MEDIUM, (128, 255, 128))
         cls.render_text_anchored(
             "press ENTER to play again", FontAnchor(Anchor.CENTER, Anchor.CENTER), (0, 50), FontSize.SMALL, (128, 128, 128))
+
+        history = stats.history.summary()
+        if (history['runs'] > 0):
+            cls.render_text_anchored(
+                f"{history['runs']} run{'s' if history['runs'] != 1 else ''}: "
+                f"mean {history['mean']:.1f} (± {history['std']:.1f}), "
+                f"median {history['p50']:.0f}, top 10% {history['p90']:.0f}",
+                FontAnchor(Anchor.CENTER, Anchor.CENTER), (0, 110), FontSize.SMALL, (110, 110, 110))
+            cls.render_text_anchored(
+                f"most deaths between heights {history['deadliest_band']} and "
+                f"{history['deadliest_band'] + RunHistory.band_size - 1}",
+                FontAnchor(Anchor.CENTER, Anchor.CENTER), (0, 140), FontSize.SMALL, (110, 110, 110))
+
+    # Render the frame profiler's percentiles
+    @classmethod
+    def profiler_view(cls):
+        y = 40
+        cls.render_text("p50 / p95 / p99 ms", (10, y), color=(255, 255, 0))
+        for name, (p50, p95, p99) in Profiler.summary().items():
+            y += 22
+            cls.render_text(f"{name}: {p50:.2f} / {p95:.2f} / {p99:.2f}", (10, y), color=(255, 255, 0))
+        # background saving (see SaveWriter)
+        y += 22
+        cls.render_text(f"save queue: {SaveWriter.queue_depth()} (max {SaveWriter.max_depth}), "
+                        f"write: {SaveWriter.last_latency:.1f} ms (max {SaveWriter.max_latency:.1f}), "
+                        f"errors: {SaveWriter.errors}, dropped: {SaveWriter.dropped}",
+                        (10, y), color=(255, 255, 0))
+
+    @classmethod
+    def __get_overlay(cls) -> Surface:
+        if (cls.__overlay is None or cls.__overlay.get_size() != (Stage.WIDTH, Stage.HEIGHT)):
+            cls.__overlay = Surface((Stage.WIDTH, Stage.HEIGHT))
+            cls.__overlay.set_alpha(160)
+        return cls.__overlay
@@ -0,0 +1,65 @@
+import pygame
+
+# The player's input during a single frame
+
+class InputState:
+    def __init__(self, left: bool = False, right: bool = False, jump: bool = False):
+        self.left = left
+        self.right = right
+        self.jump = jump
+
+    # -1 = left, 1 = right, 0 = neither or both
+    @property
+    def horizontal(self) -> int:
+        return int(self.right) - int(self.left)
+
+    # Bits: 1 = left, 2 = right, 4 = jump
+    def to_mask(self) -> int:
+        return int(bool(self.left)) | int(bool(self.right)) << 1 | int(bool(self.jump)) << 2
+
+    @classmethod
+    def from_mask(cls, mask: int) -> 'InputState':
+        return InputState(bool(mask & 1), bool(mask & 2), bool(mask & 4))
+
+# Base type for anything that drives the player, polled once per frame
+
+class InputSource:
+    """Provides the input state for the player controller. The default source never presses anything."""
+    def __init__(self):
+        self.state = InputState()
+
+    # Advance to the input of the next frame
+    def update(self):
+        pass
+
+# Horizontal input: arrow keys, A and D
+# Jump: space
+
+class KeyboardInput(InputSource):
+    def update(self):
+        keys = pygame.key.get_pressed()
+        self.state = InputState(keys[pygame.K_a] or keys[pygame.K_LEFT],
+                                keys[pygame.K_d] or keys[pygame.K_RIGHT],
+                                keys[pygame.K_SPACE])
+
+# Plays back a predefined sequence of input states
+
+class ScriptedInput(InputSource):
+    def __init__(self, states: list[InputState], loop: bool = False):
+        """
+        states = input for each frame\n
+        loop = start over after the last state, otherwise stay idle
+        """
+        super().__init__()
+        self.__states = states
+        self.__loop = loop
+        self.__frame = 0
+
+    def update(self):
+        if (self.__frame >= len(self.__states)):
+            if (not self.__loop or len(self.__states) == 0):
+                self.state = InputState()
+                return
+            self.__frame = 0
+        self.state = self.__states[self.__frame]
+        self.__frame += 1
@@ -0,0 +1,47 @@
+# A bounded free list of objects, which can be reused instead of allocating new ones
+
+class ObjectPool:
+    def __init__(self, max_size: int):
+        """
+        max_size = how many free objects are kept at most (released objects beyond that are dropped)\n
+        The pool only stores objects: the owning class decides how they are reinitialized.
+        """
+        self.max_size = max_size
+        self.__free = []
+        # acquisitions served from / missed by the pool & releases dropped because the pool was full
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self.__free)
+
+    # Returns a free object or None, in which case the caller creates a new one
+    def acquire(self):
+        if (len(self.__free) > 0):
+            self.hits += 1
+            return self.__free.pop()
+        self.misses += 1
+        return None
+
+    # The object must not be used by anything after it has been released
+    def release(self, obj):
+        if (len(self.__free) < self.max_size):
+            self.__free.append(obj)
+        else:
+            self.dropped += 1
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0
+
+    def stats(self) -> dict:
+        return {'size': len(self.__free), 'max_size': self.max_size, 'hits': self.hits,
+                'misses': self.misses, 'dropped': self.dropped, 'hit_rate': self.hit_rate}
+
+    def clear(self):
+        self.__free.clear()
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
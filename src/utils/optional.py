@@ -0,0 +1,9 @@
+# Optional dependencies, imported in one place
+# Without NumPy every collision is tested & every platform moved one at a time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
@@ -0,0 +1,127 @@
+import csv
+import json
+import time
+from array import array
+
+# The newest samples of a single phase
+
+class _RingBuffer:
+    __slots__ = ('samples', 'next', 'count')
+
+    def __init__(self, capacity: int):
+        self.samples = array('d', bytes(8 * capacity))
+        self.next = 0
+        self.count = 0
+
+    def append(self, value: float):
+        self.samples[self.next] = value
+        self.next += 1
+        if (self.next == len(self.samples)):
+            self.next = 0
+        if (self.count < len(self.samples)):
+            self.count += 1
+
+    # oldest to newest
+    def to_list(self) -> list[float]:
+        if (self.count < len(self.samples)):
+            return list(self.samples[:self.count])
+        return list(self.samples[self.next:]) + list(self.samples[:self.next])
+
+# Times the phases of a frame into fixed-size ring buffers
+
+class Profiler:
+    """
+    Phases are only timed while enabled: when disabled the game calls them directly,
+    so the only cost is checking Profiler.enabled once per frame.
+    """
+    enabled = False
+    # shows the percentiles on screen (toggled in game)
+    overlay = False
+    # samples kept per phase
+    capacity = 600
+    # where the samples are written on exit (.csv or .json, None = not written)
+    dump_path: str = None
+
+    __buffers: dict[str, _RingBuffer] = {}
+    # the overlay's percentiles are recomputed only this often (in seconds)
+    summary_interval = 0.5
+    __summary: dict[str, tuple] = {}
+    __summary_time = 0
+
+    # phases = (name, function) pairs, which are called & timed in order
+    @classmethod
+    def run(cls, phases: tuple):
+        clock = time.perf_counter
+        for name, func in phases:
+            start = clock()
+            func()
+            cls.record(name, (clock() - start) * 1000)
+
+    @classmethod
+    def measure(cls, name: str, func):
+        start = time.perf_counter()
+        func()
+        cls.record(name, (time.perf_counter() - start) * 1000)
+
+    # ms = duration of the phase in milliseconds
+    @classmethod
+    def record(cls, name: str, ms: float):
+        buffer = cls.__buffers.get(name)
+        if (buffer is None):
+            buffer = cls.__buffers[name] = _RingBuffer(cls.capacity)
+        buffer.append(ms)
+
+    # Samples of the phase from oldest to newest
+    @classmethod
+    def samples(cls, name: str) -> list[float]:
+        buffer = cls.__buffers.get(name)
+        return [] if buffer is None else buffer.to_list()
+
+    @classmethod
+    def phases(cls) -> list[str]:
+        return list(cls.__buffers)
+
+    # Nearest-rank percentiles (p50, p95, p99) of the phase in milliseconds
+    @classmethod
+    def percentiles(cls, name: str) -> tuple:
+        ordered = sorted(cls.samples(name))
+        if (len(ordered) == 0):
+            return (0, 0, 0)
+        return tuple(ordered[min(len(ordered) - 1, int(p * len(ordered)))] for p in (0.5, 0.95, 0.99))
+
+    # Percentiles of every phase, recomputed at most every summary_interval seconds
+    @classmethod
+    def summary(cls) -> dict[str, tuple]:
+        now = time.perf_counter()
+        if (now - cls.__summary_time >= cls.summary_interval):
+            cls.__summary = {name: cls.percentiles(name) for name in cls.__buffers}
+            cls.__summary_time = now
+        return cls.__summary
+
+    @classmethod
+    def toggle(cls):
+        cls.overlay = not cls.overlay
+        cls.enabled = cls.overlay or cls.dump_path is not None
+
+    @classmethod
+    def clear(cls):
+        cls.__buffers.clear()
+        cls.__summary = {}
+        cls.__summary_time = 0
+
+    # Write the buffered samples to a .csv (phase, sample, ms) or .json file
+    @classmethod
+    def dump(cls, path: str):
+        if (path.endswith('.csv')):
+            with open(path, 'w', newline='', encoding='utf-8') as target:
+                writer = csv.writer(target)
+                writer.writerow(['phase', 'sample', 'ms'])
+                for name in cls.__buffers:
+                    for i, ms in enumerate(cls.samples(name)):
+                        writer.writerow([name, i, ms])
+            return
+
+        data = {name: {'percentiles': dict(zip(('p50', 'p95', 'p99'), cls.percentiles(name))),
+                       'samples': cls.samples(name)} for name in cls.__buffers}
+        with open(path, 'w', encoding='utf-8') as target:
+            target.write(json.dumps(data, indent=4))
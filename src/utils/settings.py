@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+
+# Options of a game session
+
+@dataclass
+class Settings:
+    """
+    Simulation (read by World):\n
+    physics_rate = physics updates per second (rendering interpolates in between)\n
+    seed = level generation seed (random for every game if None)\n
+    continuous_collision = sweep the player along its motion, so it can't pass through platforms at low physics rates\n
+    Session (read by GameManager):\n
+    replay_dir = if given, every run is recorded and saved here as a replay\n
+    dirty_rects = only redraw & update the areas of the screen, which changed (see Stage)\n
+    max_frames = quit after rendering this many frames\n
+    report_startup = print the time.perf_counter() at which the first frame was presented (see benchmarks/startup.py)
+    """
+    physics_rate: int = 60
+    seed: int = None
+    continuous_collision: bool = False
+
+    replay_dir: str = None
+    dirty_rects: bool = False
+    max_frames: int = None
+    report_startup: bool = False
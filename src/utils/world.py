@@ -0,0 +1,121 @@
+from pygame.math import Vector2
+from utils.data.time import Time
+from utils.data.statistics import StatHandler, DeathType
+from utils.game_state import GameStateHandler, State
+from utils.environment.platform_manager import PlatformManager
+from utils.input_source import InputSource
+from utils.settings import Settings
+from utils.gui.camera import Camera
+from utils.profiler import Profiler
+from entities.player import Player
+
+# Everything the simulation of a single game depends on
+
+class World:
+    """
+    Time, camera offset, stats, game state, platforms & player of one game.
+    They are passed explicitly to the objects using them, so several worlds can be stepped side by side
+    in the same process (rendering & window events are left to GameManager).
+    """
+    def __init__(self, width: int, height: int, input_source: InputSource = None, settings: Settings = None):
+        """
+        width, height = size of the world's view (the camera)\n
+        input_source = drives the player (idle if None)\n
+        settings = physics rate, level seed & collision mode (see Settings)
+        """
+        self.width = width
+        self.height = height
+        self.input_source = InputSource() if input_source is None else input_source
+        self.settings = Settings() if settings is None else settings
+
+        self.time = Time(self.settings.physics_rate)
+        # camera offset & the one during the previous physics step (for render interpolation)
+        self.offset = Vector2(0, 0)
+        self.prev_offset = Vector2(0, 0)
+        self.stats = StatHandler()
+        self.game_state = GameStateHandler(self.stats)
+        self.platforms = PlatformManager(self)
+        self.player: Player = None
+        self.phases: tuple = ()
+        # game time at the beginning of the current run
+        self.run_start = 0
+
+    # Starts a new game (stats & time carry over from the previous one)
+    def begin(self):
+        self.offset.update(0, 0)
+        self.prev_offset.update(0, 0)
+        self.platforms.reset()
+        sweep = self.platforms.sweep_circle if self.settings.continuous_collision else None
+        self.player = Player(self, Vector2(600, 600), 30, self.input_source, sweep)
+        self.platforms.begin(self.settings.seed)
+        # the phases of a physics step in order (timed separately when profiling)
+        self.phases = (
+            ('player.update', self.player.update),
+            ('PlatformManager.update', self.platforms.update),
+            ('collision_response', self.player.controller.collision_response),
+            ('camera.update', self.player.camera.update),
+            ('update_score', self.update_score)
+        )
+        self.game_state.state = State.RUNNING
+        self.run_start = self.time.time
+
+    @property
+    def camera(self) -> Camera:
+        return self.player.camera
+
+    @property
+    def state(self) -> State:
+        return self.game_state.state
+
+    # A single physics step
+    def step(self):
+        self.player.controller.input_source.update()
+        self.time.step()
+        self.gameplay_loop()
+
+    # Updates entities etc
+    def gameplay_loop(self):
+        if (Profiler.enabled):
+            Profiler.run(self.phases)
+            return
+        for _, update in self.phases:
+            update()
+
+    # Runs the game as fast as possible (one physics step per frame)
+    # Returns the number of frames simulated, which is less than max_frames on gameover
+    def simulate(self, max_frames: int) -> int:
+        frames = 0
+        while (frames < max_frames):
+            self.check_gameover()
+            if (self.game_state.state != State.RUNNING):
+                break
+            self.step()
+            frames += 1
+        return frames
+
+    # The saved record of the run, None until it has ended
+    def run_record(self) -> dict:
+        if (self.game_state.state != State.ENDED):
+            return None
+        return {
+            'score': int(self.stats.score),
+            'death': self.stats.death_type.name.lower(),
+            'duration': round(self.time.time - self.run_start, 3),
+            'seed': self.platforms.seed,
+            'height': self.stats.height
+        }
+
+    def update_score(self):
+        self.stats.update_score(self.player.coll.bounds.bottom, self.height)
+
+    # The state rendering interpolates from
+    def store_previous_state(self):
+        self.player.store_position()
+        self.platforms.store_positions()
+        self.prev_offset.update(self.offset)
+
+    # The player falls to their death below the screen
+    def check_gameover(self):
+        if (self.game_state.state == State.RUNNING):
+            if (self.player.camera.is_below_frustum()):
+                self.game_state.on_gameover(DeathType.FALL)
@@ -1,8 +1,16 @@
+import shlex
 from invoke import task
 
 @task
-def start(ctx):
-    ctx.run("python3 src/main.py", pty=True)
+def start(ctx, dirty_rects=False, profile=False, continuous_collision=False, record=False):
+    flags = " --dirty-rects" if dirty_rects else ""
+    if profile:
+        flags += " --profile"
+    if continuous_collision:
+        flags += " --continuous-collision"
+    if record:
+        flags += " --record"
+    ctx.run(f"python3 src/main.py{flags}", pty=True)
 
 @task
 def test(ctx):
@@ -16,6 +24,26 @@ def coverage(ctx):
 def coverage_report(ctx):
     ctx.run("coverage html", pty=True)
 
+@task
+def bench(ctx, tolerance=0.2, frames=5000, save_baseline=False):
+    flags = f"--output ../bench_results.json --tolerance {tolerance} --frames {frames}"
+    if save_baseline:
+        flags += " --save-baseline"
+    ctx.run(f"cd src && python3 -m benchmarks.suite {flags}", pty=True)
+
+@task(iterable=['set_'])
+def rollout(ctx, runs=1000, frames=18000, workers=0, first_seed=0, set_=None):
+    flags = f"--output ../rollout_results.json --runs {runs} --frames {frames} --first-seed {first_seed}"
+    if workers > 0:
+        flags += f" --workers {workers}"
+    for override in set_:
+        flags += f" --set {shlex.quote(override)}"
+    ctx.run(f"cd src && python3 -m benchmarks.rollout {flags}", pty=True)
+
+@task
+def startup_bench(ctx, runs=5):
+    ctx.run(f"cd src && python3 -m benchmarks.startup --runs {runs}", pty=True)
+
 @task
 def lint(ctx):
     ctx.run("pylint src", pty=True)
\ No newline at end of file